@@ -14,8 +14,8 @@ async def parse_addresses_input(text: str, web3_manager: Web3Manager) -> Tuple[L
     valid: List[str] = []
     errors: List[str] = []
     ens_map: Dict[str, str] = {}
-    had_candidates = False
 
+    candidates: List[Tuple[str, bool]] = []
     for token in tokens:
         token = token.strip()
         if not token:
@@ -25,16 +25,20 @@ async def parse_addresses_input(text: str, web3_manager: Web3Manager) -> Tuple[L
 
         if not (is_address_like or is_ens_like):
             continue
+        candidates.append((token, is_ens_like))
 
-        had_candidates = True
+    ens_names = [token for token, is_ens_like in candidates if is_ens_like and not Web3.is_address(token)]
+    resolved_names = await web3_manager.resolve_ens_many(ens_names) if ens_names else {}
+    had_candidates = bool(candidates)
 
+    for token, is_ens_like in candidates:
         if Web3.is_address(token):
             checksum = Web3.to_checksum_address(token)
             valid.append(checksum)
             continue
 
         if is_ens_like:
-            resolved = await web3_manager.resolve_ens(token)
+            resolved = resolved_names.get(token)
             if resolved and Web3.is_address(resolved):
                 checksum = Web3.to_checksum_address(resolved)
                 valid.append(checksum)
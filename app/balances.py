@@ -1,25 +1,35 @@
 import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from web3 import Web3
 
-from .abis import ERC20_ABI_SIMPLIFIED
 from .chains import CHAIN_TO_ALCHEMY_PREFIX, CHAIN_TO_RPC_URL
+from .circuit import CircuitOpenError, circuit_breaker
+from .multicall import aggregate3, balance_of_calldata, decode_uint
+from .rpc import RpcPool
 
 logger = logging.getLogger(__name__)
 
-async def fetch_alchemy_balances(session, api_key: str, eoa: str, chain_id: int) -> Dict[str, str]:
+
+class BalanceFetchError(Exception):
+    pass
+
+
+async def fetch_alchemy_balances(session, api_key: str, eoa: str, chain_id: int) -> Optional[Dict[str, str]]:
     prefix = CHAIN_TO_ALCHEMY_PREFIX.get(chain_id)
     if not prefix:
         if chain_id in CHAIN_TO_RPC_URL:
-            return {}
+            return None
         logger.warning("No Alchemy prefix for chain %s", chain_id)
-        return {}
+        return None
 
     if not api_key:
         logger.warning("Alchemy API key missing; skipping token balance fetch")
-        return {}
+        return None
+    breaker = circuit_breaker(f"alchemy:{chain_id}")
+    if not breaker.allow():
+        return None
     url = f"https://{prefix}.g.alchemy.com/v2/{api_key}"
     payload = {
         "jsonrpc": "2.0",
@@ -32,8 +42,10 @@ async def fetch_alchemy_balances(session, api_key: str, eoa: str, chain_id: int)
         async with session.post(url, json=payload, timeout=10) as response:
             if response.status != 200:
                 logger.error("Alchemy error %s for %s on chain %s", response.status, eoa, chain_id)
-                return {}
+                breaker.record_failure()
+                return None
             data = await response.json()
+            breaker.record_success()
             if "result" in data and "tokenBalances" in data["result"]:
                 balances = {
                     item["contractAddress"].lower(): item["tokenBalance"]
@@ -43,67 +55,80 @@ async def fetch_alchemy_balances(session, api_key: str, eoa: str, chain_id: int)
                 return balances
             if "error" in data:
                 logger.error("Alchemy API error for %s on chain %s: %s", eoa, chain_id, data["error"])
+                return None
             return {}
     except Exception as exc:
         logger.error("Alchemy request failed for %s on chain %s: %s", eoa, chain_id, exc)
-    return {}
+        breaker.record_failure()
+    return None
 
-async def fetch_balances_for_eoa_on_chain(
-    eoa: str,
+
+async def fetch_balances_for_eoas_on_chain(
+    eoas: List[str],
     chain_id: int,
-    vaults_data: list,
-    w3_instance: Optional[Web3],
+    token_addresses: Iterable[str],
+    rpc: Optional[RpcPool],
     session,
     api_key: str,
-    direct_call_concurrency: int = 20,
-) -> Dict[str, str]:
-    balances: Dict[str, str] = {}
-    loop = asyncio.get_running_loop()
-
-    try:
-        alchemy_balances = await fetch_alchemy_balances(session, api_key, eoa, chain_id)
-        if alchemy_balances:
-            balances.update({k.lower(): v for k, v in alchemy_balances.items()})
-    except Exception as exc:
-        logger.error("Alchemy balance fetch failed for %s on chain %s: %s", eoa, chain_id, exc)
-
-    if chain_id == 1:
+    chunk_concurrency: int = 4,
+) -> Dict[str, Dict[str, str]]:
+    balances: Dict[str, Dict[str, str]] = {eoa: {} for eoa in eoas}
+    if not eoas:
         return balances
 
-    if not w3_instance:
-        logger.warning("No Web3 instance for chain %s, skipping direct balanceOf", chain_id)
+    alchemy_results = await asyncio.gather(
+        *[fetch_alchemy_balances(session, api_key, eoa, chain_id) for eoa in eoas],
+        return_exceptions=True,
+    )
+    without_alchemy: List[str] = []
+    for eoa, result in zip(eoas, alchemy_results):
+        if isinstance(result, dict):
+            balances[eoa].update({k.lower(): v for k, v in result.items()})
+        else:
+            if isinstance(result, BaseException):
+                logger.error("Alchemy balance fetch failed for %s on chain %s: %s", eoa, chain_id, result)
+            without_alchemy.append(eoa)
+
+    # Alchemy already covers every ERC-20 on Ethereum; Multicall3 there only stands in when Alchemy is unavailable.
+    rpc_eoas = without_alchemy if chain_id == 1 else eoas
+    if not rpc_eoas:
         return balances
 
-    semaphore = asyncio.Semaphore(direct_call_concurrency)
-
-    async def direct_balance_call(vault_data: dict) -> Optional[tuple]:
-        address = vault_data.get("address")
-        if not address or not Web3.is_address(address):
-            return None
-        checksum = Web3.to_checksum_address(address)
-        addr_lower = checksum.lower()
-        if addr_lower in balances and balances[addr_lower] != "0x0":
-            return None
-        try:
-            async with semaphore:
-                def _call_balance() -> int:
-                    contract = w3_instance.eth.contract(address=checksum, abi=ERC20_ABI_SIMPLIFIED)
-                    return contract.functions.balanceOf(eoa).call()
-
-                value = await loop.run_in_executor(None, _call_balance)
-            if value > 0:
-                return (addr_lower, hex(value))
-        except Exception as exc:
-            logger.error("Direct balanceOf failed for %s on chain %s: %s", checksum, chain_id, exc)
-        return None
-
-    vaults_on_chain = [v for v in vaults_data if v.get("chainID") == chain_id]
-    tasks = [direct_balance_call(v) for v in vaults_on_chain]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    if not rpc:
+        if without_alchemy:
+            raise BalanceFetchError(f"No RPC client for chain {chain_id}")
+        logger.warning("No RPC client for chain %s, skipping Multicall3 balanceOf", chain_id)
+        return balances
+    if rpc.breaker.blocked:
+        if without_alchemy:
+            raise CircuitOpenError(f"No balance source available on chain {chain_id}")
+        return balances
 
-    for result in results:
-        if isinstance(result, tuple):
-            addr, value = result
-            balances[addr] = value
+    tokens = []
+    seen = set()
+    for token in token_addresses:
+        if not token or not Web3.is_address(token):
+            continue
+        token_lower = token.lower()
+        if token_lower not in seen:
+            seen.add(token_lower)
+            tokens.append(token_lower)
+
+    calls: List[Tuple[str, bytes]] = []
+    call_keys: List[Tuple[str, str]] = []
+    for eoa in rpc_eoas:
+        owner_calldata = balance_of_calldata(eoa)
+        for token_lower in tokens:
+            known = balances[eoa].get(token_lower)
+            if known and known != "0x0":
+                continue
+            calls.append((token_lower, owner_calldata))
+            call_keys.append((eoa, token_lower))
+
+    results = await aggregate3(rpc.eth_call, calls, chain_id, concurrency=chunk_concurrency)
+    for (eoa, token_lower), return_data in zip(call_keys, results):
+        value = decode_uint(return_data)
+        if value:
+            balances[eoa][token_lower] = hex(value)
 
     return balances
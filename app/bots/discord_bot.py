@@ -1,8 +1,9 @@
 import asyncio
 import logging
+import time
 from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 import discord
 from discord.ext import commands, tasks
@@ -10,8 +11,10 @@ from ..addressing import parse_addresses_input
 from ..config import Config
 from ..format.discord import render_report, render_suggestions
 from ..messages import split_lines
-from ..report import ReportService, format_tvl
+from ..report import ReportData, ReportService, format_tvl
+from ..report_queue import PRIORITY_DAILY, QueueFullError, ReportQueue
 from ..storage import SQLiteStore
+from ..usage import UsageRecorder
 from ..web3_utils import Web3Manager
 from ..chains import CHAIN_NAMES
 from ..yearn_api import YearnApi
@@ -146,10 +149,14 @@ class DiscordBot:
         web3_manager: Web3Manager,
         http_client,
         yearn_api: YearnApi,
+        usage: UsageRecorder,
+        report_queue: ReportQueue,
     ) -> None:
         self._config = config
         self._store = store
+        self._usage = usage
         self._report_service = report_service
+        self._report_queue = report_queue
         self._web3 = web3_manager
         self._http = http_client
         self._yearn = yearn_api
@@ -161,6 +168,7 @@ class DiscordBot:
 
         self.bot = commands.Bot(command_prefix="!", intents=intents)
         self._locks: Dict[str, asyncio.Lock] = {}
+        self._followups: Dict[str, asyncio.Task] = {}
         self._last_report_times: Dict[str, datetime] = {}
         self._last_scheduled_report_id: Optional[int] = None
 
@@ -275,41 +283,98 @@ class DiscordBot:
             return
 
         async with lock:
-            await interaction.response.defer(ephemeral=True, thinking=True)
-            await interaction.followup.send(
-                "🔄 Generating your Yearn portfolio report...\n\nThis might take a minute or two, especially if checking multiple chains...",
-                ephemeral=True,
-                suppress_embeds=True,
-            )
-            try:
-                report = await self._report_service.generate(addresses)
-            except Exception as exc:
-                logger.error("Discord report generation failed: %s", exc)
-                await interaction.followup.send(
-                    "❌ An error occurred while generating your report. Please try again later.",
-                    ephemeral=True,
-                )
-                return
-
-            await self._store.increment_usage(on_demand=1)
+            started = time.monotonic()
+            report = self._report_service.cached_report(addresses)
+            if report is not None:
+                await interaction.response.defer(ephemeral=True, thinking=True)
+            else:
+                try:
+                    queued = self._report_queue.submit("discord", lambda: self._report_service.generate(addresses))
+                except QueueFullError:
+                    await interaction.response.send_message(
+                        "🚦 Lots of reports are being generated right now. Please try again in a few minutes.",
+                        ephemeral=True,
+                    )
+                    return
+                await interaction.response.defer(ephemeral=True, thinking=True)
+                if queued.position:
+                    status = f"⏳ You're #{queued.position} in the queue. Your report will start shortly..."
+                else:
+                    status = "🔄 Generating your Yearn portfolio report...\n\nThis might take a minute or two, especially if checking multiple chains..."
+                await interaction.followup.send(status, ephemeral=True, suppress_embeds=True)
+                try:
+                    report = await queued.future
+                except Exception as exc:
+                    logger.error("Discord report generation failed: %s", exc)
+                    self._usage.record_report("discord", "on_demand", time.monotonic() - started, ok=False)
+                    await interaction.followup.send(
+                        "❌ An error occurred while generating your report. Please try again later.",
+                        ephemeral=True,
+                    )
+                    return
+
+            self._usage.record_report("discord", "on_demand", time.monotonic() - started)
+            await self._send_report_sections(interaction, user_id, report)
+            if report.partial:
+                self._schedule_followup(interaction, user_id, addresses)
+
+    async def _send_report_sections(
+        self,
+        interaction: discord.Interaction,
+        user_id: str,
+        report: ReportData,
+        intro: Optional[str] = None,
+    ) -> None:
+        report_lines = render_report(report, self._config)
+        if intro:
+            report_lines = [intro] + report_lines
+        suggestions_lines = render_suggestions(report.suggestions)
+        sections = [report_lines]
+        if suggestions_lines:
+            sections.append(suggestions_lines)
 
-            report_lines = render_report(report, self._config)
-            suggestions_lines = render_suggestions(report.suggestions)
-            sections = [report_lines]
-            if suggestions_lines:
-                sections.append(suggestions_lines)
+        view = ManageAddressesView(self._store, self._web3, user_id)
 
-            view = ManageAddressesView(self._store, self._web3, user_id)
+        for idx, section in enumerate(sections):
+            chunks = split_lines(section, DISCORD_MAX_LEN)
+            for chunk_index, chunk in enumerate(chunks):
+                is_last_section = idx == len(sections) - 1
+                is_last_chunk = chunk_index == len(chunks) - 1
+                payload = {"ephemeral": True, "suppress_embeds": True}
+                if is_last_section and is_last_chunk:
+                    payload["view"] = view
+                await interaction.followup.send(chunk, **payload)
+
+    def _schedule_followup(self, interaction: discord.Interaction, user_id: str, addresses: List[str]) -> None:
+        previous = self._followups.get(user_id)
+        if previous and not previous.done():
+            previous.cancel()
+        task = asyncio.create_task(self._send_followup_report(interaction, user_id, addresses))
+        self._followups[user_id] = task
+        task.add_done_callback(
+            lambda done: self._followups.pop(user_id, None) if self._followups.get(user_id) is done else None
+        )
 
-            for idx, section in enumerate(sections):
-                chunks = split_lines(section, DISCORD_MAX_LEN)
-                for chunk_index, chunk in enumerate(chunks):
-                    is_last_section = idx == len(sections) - 1
-                    is_last_chunk = chunk_index == len(chunks) - 1
-                    payload = {"ephemeral": True, "suppress_embeds": True}
-                    if is_last_section and is_last_chunk:
-                        payload["view"] = view
-                    await interaction.followup.send(chunk, **payload)
+    async def _send_followup_report(self, interaction: discord.Interaction, user_id: str, addresses: List[str]) -> None:
+        # Interaction webhooks stay valid for 15 minutes, well past the follow-up deadline.
+        try:
+            report = await self._report_queue.run_job(
+                "discord",
+                lambda: self._report_service.generate(addresses, deadline=self._config.report_followup_seconds),
+                PRIORITY_DAILY,
+            )
+        except Exception as exc:
+            logger.error("Discord follow-up report for %s failed: %s", user_id, exc)
+            return
+        if report.partial:
+            logger.info("Discord follow-up report for %s still missing %s", user_id, report.delayed_chains)
+            return
+        try:
+            await self._send_report_sections(
+                interaction, user_id, report, intro="✅ *Delayed data is in. Here is your full report.*"
+            )
+        except Exception as exc:
+            logger.error("Failed to send Discord follow-up report to %s: %s", user_id, exc)
 
     async def _handle_addresses(self, interaction: discord.Interaction) -> None:
         user_id = str(interaction.user.id)
@@ -329,6 +394,10 @@ class DiscordBot:
         await self.bot.start(self._config.discord_bot_token)
 
     async def close(self) -> None:
+        followups = list(self._followups.values())
+        for task in followups:
+            task.cancel()
+        await asyncio.gather(*followups, return_exceptions=True)
         await self.bot.close()
 
     @tasks.loop(hours=3)
@@ -342,8 +411,8 @@ class DiscordBot:
     async def _send_top_vaults_report(self) -> None:
         try:
             await self._yearn.ensure_ydaemon_cache()
-            vaults_data = self._yearn.get_ydaemon_data()
-            if not vaults_data:
+            catalog = self._yearn.get_vault_catalog()
+            if not catalog:
                 return
 
             single_asset_addresses = {
@@ -351,39 +420,22 @@ class DiscordBot:
             }
 
             filtered = []
-            for vault in vaults_data:
-                if not vault.get("address") or not vault.get("chainID") or not vault.get("token", {}).get("address"):
+            for record in catalog.records:
+                if not record.token_address_lower:
                     continue
-                if vault.get("info", {}).get("retired", False):
+                if record.retired:
                     continue
-                if vault.get("kind") != "Multi Strategy":
+                if record.kind != "Multi Strategy":
                     continue
-                if vault["token"]["address"].lower() not in single_asset_addresses:
+                if record.token_address_lower not in single_asset_addresses:
                     continue
-                if Decimal(vault.get("tvl", {}).get("tvl", 0)) < Decimal("50000"):
+                if record.tvl_usd < Decimal("50000"):
                     continue
-
-                apr_data = vault.get("apr", {})
-                points_data = apr_data.get("points", {})
-                net_apr = apr_data.get("netAPR")
-                week_ago = points_data.get("weekAgo")
-                month_ago = points_data.get("monthAgo")
-
-                if net_apr is not None:
-                    primary_apr = float(net_apr)
-                elif week_ago is not None:
-                    primary_apr = float(week_ago)
-                elif month_ago is not None:
-                    primary_apr = float(month_ago)
-                else:
-                    primary_apr = 0.0
-
-                if abs(primary_apr) < 0.000001:
+                if abs(record.sort_apr) < 0.000001:
                     continue
-                vault["_sort_apr"] = primary_apr
-                filtered.append(vault)
+                filtered.append(record)
 
-            filtered.sort(key=lambda v: float(v.get("_sort_apr", 0.0)), reverse=True)
+            filtered.sort(key=lambda r: r.sort_apr, reverse=True)
             top_vaults = filtered[:5]
             if not top_vaults:
                 return
@@ -397,16 +449,14 @@ class DiscordBot:
                 color=discord.Color.blue(),
             )
 
-            for idx, vault in enumerate(top_vaults, start=1):
-                name = vault.get("display_name") or vault.get("name", "Unknown")
-                token = vault.get("token", {}).get("symbol", "?")
-                chain_id = vault.get("chainID")
+            for idx, record in enumerate(top_vaults, start=1):
+                name = record.display_name
+                token = record.token_raw_symbol
+                chain_id = record.chain_id
                 chain = CHAIN_NAMES.get(chain_id, str(chain_id))
-                vault_address = vault.get("address")
-                apr_value = vault.get("_sort_apr", 0)
-                apr_percent = Decimal(apr_value) * Decimal("100")
-                tvl_vault = format_tvl(Decimal(vault.get("tvl", {}).get("tvl", 0)))
-                vault_url = f"https://yearn.fi/v3/{chain_id}/{vault_address}"
+                apr_percent = Decimal(record.sort_apr) * Decimal("100")
+                tvl_vault = format_tvl(record.tvl_usd)
+                vault_url = record.vault_url
 
                 embed.add_field(
                     name=f"{idx}. {name}",
@@ -1,16 +1,23 @@
 import asyncio
 import logging
-from typing import List
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from telegram import BotCommand, InlineKeyboardButton, InlineKeyboardMarkup, MessageEntity, Update
+from telegram.error import BadRequest, Forbidden
 from telegram.ext import Application, ApplicationBuilder, CallbackContext, CallbackQueryHandler, CommandHandler, MessageHandler, filters
 from telegramify_markdown import convert, split_entities
 
 from ..addressing import parse_addresses_input
 from ..config import Config
-from ..report import ReportService
+from ..report import ReportData, ReportService
+from ..report_queue import PRIORITY_DAILY, QueueFullError, ReportQueue
+from ..scheduling import daily_run_id, daily_slot, parse_daily_time
 from ..web3_utils import Web3Manager
 from ..storage import SQLiteStore
+from ..usage import UsageRecorder
+from .telegram_sender import TelegramSender
 from ..format.telegram import (
     escape_markdown,
     render_chain_sections,
@@ -28,19 +35,42 @@ CALLBACK_HELP = "action:help"
 
 TELEGRAM_MAX_LEN = 4096
 
+OUTBOX_BATCH_SIZE = 200
+OUTBOX_POLL_SECONDS = 5
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_RETENTION_DAYS = 7
+PREWARM_SLACK_SECONDS = 120
+
+
 class TelegramBot:
-    def __init__(self, config: Config, store: SQLiteStore, report_service: ReportService, web3_manager: Web3Manager) -> None:
+    def __init__(
+        self,
+        config: Config,
+        store: SQLiteStore,
+        report_service: ReportService,
+        web3_manager: Web3Manager,
+        usage: UsageRecorder,
+        report_queue: ReportQueue,
+    ) -> None:
         self._config = config
         self._store = store
+        self._usage = usage
         self._report_service = report_service
+        self._report_queue = report_queue
         self._web3 = web3_manager
         self._application: Application = ApplicationBuilder().token(config.telegram_bot_token).build()
         self._locks: dict[str, asyncio.Lock] = {}
+        self._sender = TelegramSender(self._application.bot)
+        self._outbox_wakeup = asyncio.Event()
+        self._outbox_task: Optional[asyncio.Task] = None
+        self._followups: Dict[str, asyncio.Task] = {}
 
         self._application.add_handler(CommandHandler("start", self._start))
         self._application.add_handler(CommandHandler("yport", self._yport_command))
         self._application.add_handler(CommandHandler("addresses", self._addresses_command))
         self._application.add_handler(CommandHandler("dailytoggle", self._daily_toggle_command))
+        self._application.add_handler(CommandHandler("dailytime", self._daily_time_command))
         self._application.add_handler(CommandHandler("help", self._help_command))
         self._application.add_handler(CallbackQueryHandler(self._button_handler))
         self._application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
@@ -54,9 +84,18 @@ class TelegramBot:
         await self._application.start()
         await self._application.updater.start_polling()
         await self._register_commands()
+        self._outbox_task = asyncio.create_task(self._outbox_loop())
         logger.info("Telegram bot started")
 
     async def stop(self) -> None:
+        if self._outbox_task:
+            self._outbox_task.cancel()
+            await asyncio.gather(self._outbox_task, return_exceptions=True)
+        followups = list(self._followups.values())
+        for task in followups:
+            task.cancel()
+        await asyncio.gather(*followups, return_exceptions=True)
+        await self._sender.close()
         await self._application.updater.stop()
         await self._application.stop()
         await self._application.shutdown()
@@ -68,6 +107,7 @@ class TelegramBot:
             BotCommand("yport", "Generate your report"),
             BotCommand("addresses", "Manage addresses"),
             BotCommand("dailytoggle", "Toggle daily reports"),
+            BotCommand("dailytime", "Set daily report time (UTC)"),
             BotCommand("help", "Help"),
         ]
         await self._application.bot.set_my_commands(commands)
@@ -113,6 +153,7 @@ class TelegramBot:
             "/yport - generate a report\n"
             "/addresses - view or replace addresses\n"
             "/dailytoggle - toggle daily reports\n"
+            "/dailytime HH:MM - set daily report time in UTC (/dailytime auto to reset)\n"
         )
         await self._reply(update, context, message, reply_markup=await self._main_keyboard_for(user_id))
 
@@ -127,12 +168,38 @@ class TelegramBot:
         new_state = not enabled
         await self._store.set_daily_reports("telegram", user_id, new_state)
         if new_state:
-            time_str = self._config.daily_report_time_utc.strftime("%H:%M")
+            time_str = await self._daily_time_label(user_id)
             message = f"🔔 Daily reports enabled. Expect them around {time_str} UTC."
         else:
             message = "🔕 Daily reports disabled."
         await self._reply(update, context, message, reply_markup=await self._main_keyboard_for(user_id))
 
+    async def _daily_time_label(self, user_id: str) -> str:
+        preferred = parse_daily_time(await self._store.get_daily_report_time("telegram", user_id))
+        slot = daily_slot(
+            "telegram",
+            user_id,
+            datetime.utcnow().date(),
+            self._config.daily_report_time_utc,
+            self._config.daily_report_window_minutes,
+            preferred,
+        )
+        return slot.strftime("%H:%M")
+
+    async def _daily_time_command(self, update: Update, context: CallbackContext) -> None:
+        user_id = str(update.effective_chat.id)
+        arg = context.args[0] if context.args else ""
+        if arg.lower() == "auto":
+            await self._store.set_daily_report_time("telegram", user_id, None)
+        elif arg:
+            preferred = parse_daily_time(arg)
+            if preferred is None:
+                await self._reply(update, context, "⚠️ Use /dailytime HH:MM (UTC), e.g. /dailytime 07:30.")
+                return
+            await self._store.set_daily_report_time("telegram", user_id, preferred.strftime("%H:%M"))
+        message = f"⏰ Daily reports are sent around {await self._daily_time_label(user_id)} UTC."
+        await self._reply(update, context, message, reply_markup=await self._main_keyboard_for(user_id))
+
     async def _yport_command(self, update: Update, context: CallbackContext) -> None:
         await self._send_report(update, context)
 
@@ -251,97 +318,228 @@ class TelegramBot:
             return
 
         async with lock:
-            await context.bot.send_message(
-                chat_id=user_id,
-                text="🔄 Generating your Yearn portfolio report...\n\nThis might take a minute...",
+            started = time.monotonic()
+            report = self._report_service.cached_report(addresses)
+            if report is None:
+                try:
+                    queued = self._report_queue.submit("telegram", lambda: self._report_service.generate(addresses))
+                except QueueFullError:
+                    await self._sender.send_message(
+                        user_id,
+                        text="🚦 Lots of reports are being generated right now. Please try again in a few minutes.",
+                        reply_markup=await self._main_keyboard_for(user_id),
+                    )
+                    return
+                if queued.position:
+                    status = f"⏳ You're #{queued.position} in the queue. Your report will start shortly..."
+                else:
+                    status = "🔄 Generating your Yearn portfolio report...\n\nThis might take a minute..."
+                await self._sender.send_message(user_id, text=status)
+                try:
+                    report = await queued.future
+                except Exception as exc:
+                    logger.error("Report generation failed: %s", exc)
+                    self._usage.record_report("telegram", "on_demand", time.monotonic() - started, ok=False)
+                    await self._sender.send_message(
+                        user_id,
+                        text="❌ An error occurred while generating your report. Please try again later.",
+                    )
+                    return
+
+            self._usage.record_report("telegram", "on_demand", time.monotonic() - started)
+            await self._send_sections(user_id, self._report_sections(report))
+            if report.partial:
+                self._schedule_followup(user_id, addresses)
+
+    def _schedule_followup(self, user_id: str, addresses: List[str]) -> None:
+        previous = self._followups.get(user_id)
+        if previous and not previous.done():
+            previous.cancel()
+        task = asyncio.create_task(self._send_followup_report(user_id, addresses))
+        self._followups[user_id] = task
+        task.add_done_callback(
+            lambda done: self._followups.pop(user_id, None) if self._followups.get(user_id) is done else None
+        )
+
+    async def _send_followup_report(self, user_id: str, addresses: List[str]) -> None:
+        # Delayed chains keep loading in the background; this picks up their results once they land.
+        try:
+            report = await self._report_queue.run_job(
+                "telegram",
+                lambda: self._report_service.generate(addresses, deadline=self._config.report_followup_seconds),
+                PRIORITY_DAILY,
             )
+        except Exception as exc:
+            logger.error("Follow-up report for %s failed: %s", user_id, exc)
+            return
+        if report.partial:
+            logger.info("Follow-up report for %s still missing %s", user_id, report.delayed_chains)
+            return
+        sections = self._report_sections(report)
+        sections[0] = ["✅ *Delayed data is in. Here is your full report.*"] + sections[0]
+        try:
+            await self._send_sections(user_id, sections)
+        except Exception as exc:
+            logger.error("Failed to send follow-up report to %s: %s", user_id, exc)
+
+    def _report_sections(self, report: ReportData) -> List[List[str]]:
+        if report.empty:
+            sections = [render_report(report, self._config)]
+        else:
+            sections = render_chain_sections(report, self._config)
+            header_lines = ["✏️ **Your Yearn Portfolio Report**"]
+            if report.has_yearn_gauge_deposit:
+                header_lines.append(f"⚠️ *{escape_markdown(self._config.veyfi_deprecation_message)}*")
+            if sections:
+                sections[0] = header_lines + sections[0]
+            else:
+                sections.append(header_lines)
+            sections.append(render_overall_section(report))
+
+        suggestions_lines = render_suggestions(report.suggestions)
+        if suggestions_lines:
+            sections.append(suggestions_lines)
+        return sections
+
+    def _render_sections(self, sections: List[List[str]]) -> List[dict]:
+        messages = []
+        for idx, section in enumerate(sections):
+            chunks = self._markdown_chunks(section)
+            for chunk_index, (chunk_text, chunk_entities) in enumerate(chunks):
+                is_last_section = idx == len(sections) - 1
+                is_last_chunk = chunk_index == len(chunks) - 1
+                messages.append(
+                    {
+                        "text": chunk_text,
+                        "entities": chunk_entities,
+                        "with_keyboard": is_last_section and is_last_chunk,
+                    }
+                )
+        return messages
+
+    async def _outbound_message(self, user_id: str, text: str, entities: List[MessageEntity], with_keyboard: bool) -> dict:
+        return {
+            "text": text,
+            "entities": entities,
+            "disable_web_page_preview": True,
+            "reply_markup": await self._main_keyboard_for(user_id) if with_keyboard else None,
+        }
+
+    async def _send_sections(self, user_id: str, sections: List[List[str]]) -> None:
+        messages = [
+            await self._outbound_message(user_id, message["text"], message["entities"], message["with_keyboard"])
+            for message in self._render_sections(sections)
+        ]
+        await self._sender.send(user_id, messages)
+
+    async def send_daily_reports(self, run_id: Optional[str] = None, user_ids: Optional[Iterable[str]] = None) -> None:
+        run_id = run_id or daily_run_id(datetime.utcnow().date())
+        already_enqueued = set(await self._store.get_outbox_users("telegram", run_id))
+        address_sets: dict[str, List[str]] = {}
+        if user_ids is None:
+            async for page in self._store.iter_daily_subscribers("telegram"):
+                for subscriber in page:
+                    addresses = [row["address"] for row in subscriber["addresses"]]
+                    if addresses and subscriber["user_id"] not in already_enqueued:
+                        address_sets[subscriber["user_id"]] = addresses
+        else:
+            pending = [user_id for user_id in user_ids if user_id not in already_enqueued]
+            subscribers = await self._store.get_daily_subscribers("telegram", pending)
+            for user_id in pending:
+                subscriber = subscribers.get(user_id)
+                addresses = [row["address"] for row in subscriber["addresses"]] if subscriber else []
+                if addresses:
+                    address_sets[user_id] = addresses
+        if address_sets:
             try:
-                report = await self._report_service.generate(addresses)
-            except Exception as exc:
-                logger.error("Report generation failed: %s", exc)
-                await context.bot.send_message(
-                    chat_id=user_id,
-                    text="❌ An error occurred while generating your report. Please try again later.",
+                reports = await self._report_queue.run_job(
+                    "telegram",
+                    lambda: self._report_service.generate_many(address_sets, self._config.daily_report_concurrency),
+                    PRIORITY_DAILY,
                 )
-                return
-
-            await self._store.increment_usage(on_demand=1)
+            except Exception as exc:
+                logger.error("Daily report batch failed: %s", exc)
+                reports = {}
+
+            enqueued = 0
+            for user_id, report in reports.items():
+                if isinstance(report, Exception):
+                    logger.error("Daily report failed for %s: %s", user_id, report)
+                    self._usage.record_report("telegram", "daily", ok=False)
+                    continue
+                messages = [
+                    {**message, "entities": [entity.to_dict() for entity in message["entities"]]}
+                    for message in self._render_sections(self._report_sections(report))
+                ]
+                await self._store.enqueue_outbox("telegram", user_id, run_id, messages)
+                enqueued += 1
+            logger.info("Enqueued %d daily report(s) for %s", enqueued, run_id)
+            self._outbox_wakeup.set()
+
+        cutoff = (datetime.utcnow() - timedelta(days=OUTBOX_RETENTION_DAYS)).isoformat()
+        await self._store.purge_outbox(cutoff)
+
+    async def prewarm_daily_reports(self, user_ids: Iterable[str]) -> None:
+        address_sets = []
+        for user_id in user_ids:
+            rows = await self._store.get_addresses("telegram", user_id)
+            address_sets.append([row["address"] for row in rows])
+        hold_seconds = self._config.daily_prewarm_minutes * 60 + PREWARM_SLACK_SECONDS
+        await self._report_queue.run_job(
+            "telegram",
+            lambda: self._report_service.prewarm(address_sets, hold_seconds, self._config.daily_report_concurrency),
+            PRIORITY_DAILY,
+        )
 
-            if report.empty:
-                sections = [render_report(report, self._config)]
-            else:
-                sections = render_chain_sections(report, self._config)
-                header_lines = ["✏️ **Your Yearn Portfolio Report**"]
-                if report.has_yearn_gauge_deposit:
-                    header_lines.append(f"⚠️ *{escape_markdown(self._config.veyfi_deprecation_message)}*")
-                if sections:
-                    sections[0] = header_lines + sections[0]
-                else:
-                    sections.append(header_lines)
-                sections.append(render_overall_section(report))
-
-            suggestions_lines = render_suggestions(report.suggestions)
-            if suggestions_lines:
-                sections.append(suggestions_lines)
-
-            for idx, section in enumerate(sections):
-                chunks = self._markdown_chunks(section)
-                for chunk_index, (chunk_text, chunk_entities) in enumerate(chunks):
-                    is_last_section = idx == len(sections) - 1
-                    is_last_chunk = chunk_index == len(chunks) - 1
-                    markup = await self._main_keyboard_for(user_id) if (is_last_section and is_last_chunk) else None
-                    await context.bot.send_message(
-                        chat_id=user_id,
-                        text=chunk_text,
-                        entities=chunk_entities,
-                        disable_web_page_preview=True,
-                        reply_markup=markup,
-                    )
+    async def _outbox_loop(self) -> None:
+        while True:
+            self._outbox_wakeup.clear()
+            try:
+                await self.drain_outbox()
+            except Exception as exc:
+                logger.error("Outbox drain failed: %s", exc)
+            try:
+                await asyncio.wait_for(self._outbox_wakeup.wait(), timeout=OUTBOX_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
 
-    async def send_daily_reports(self) -> None:
-        users = await self._store.get_daily_users("telegram")
-        for row in users:
+    async def drain_outbox(self) -> None:
+        rows = await self._store.get_due_outbox("telegram", OUTBOX_BATCH_SIZE)
+        if not rows:
+            return
+        by_report: Dict[Tuple[str, str], List[dict]] = {}
+        for row in rows:
+            by_report.setdefault((row["user_id"], row["run_id"]), []).append(row)
+        await asyncio.gather(*[self._deliver_outbox_rows(report_rows) for report_rows in by_report.values()])
+        if len(rows) == OUTBOX_BATCH_SIZE:
+            self._outbox_wakeup.set()
+
+    async def _deliver_outbox_rows(self, rows: List[dict]) -> None:
+        # Delivery is at-least-once: a row is only marked sent after Telegram accepts it, so a crash between
+        # the send and mark_outbox_sent leaves it pending and the chunk is sent again after restart.
+        for row in rows:
             user_id = row["user_id"]
-            addresses_rows = await self._store.get_addresses("telegram", user_id)
-            addresses = [r["address"] for r in addresses_rows]
-            if not addresses:
-                continue
+            entities = [MessageEntity.de_json(entity, self._application.bot) for entity in row["entities"]]
             try:
-                report = await self._report_service.generate(addresses)
+                message = await self._outbound_message(user_id, row["text"], entities, row["with_keyboard"])
+                await self._sender.send(user_id, [message])
+            except (BadRequest, Forbidden) as exc:
+                logger.error("Dropping outbox message %s for %s: %s", row["id"], user_id, exc)
+                await self._store.mark_outbox_failed(row["id"], str(exc), None)
+                self._usage.record_report("telegram", "daily", ok=False)
+                continue
             except Exception as exc:
-                logger.error("Daily report failed for %s: %s", user_id, exc)
+                attempts = row["attempts"] + 1
+                retry_at = None
+                if attempts < OUTBOX_MAX_ATTEMPTS:
+                    retry_at = time.time() + OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)
+                logger.warning("Outbox delivery to %s failed (attempt %d): %s", user_id, attempts, exc)
+                await self._store.mark_outbox_failed(row["id"], str(exc), retry_at)
+                if retry_at is not None:
+                    return
+                self._usage.record_report("telegram", "daily", ok=False)
                 continue
-
-            report_lines = render_report(report, self._config)
-            if report.empty:
-                sections = [report_lines]
-            else:
-                sections = render_chain_sections(report, self._config)
-                header_lines = ["✏️ **Your Yearn Portfolio Report**"]
-                if report.has_yearn_gauge_deposit:
-                    header_lines.append(f"⚠️ *{escape_markdown(self._config.veyfi_deprecation_message)}*")
-                if sections:
-                    sections[0] = header_lines + sections[0]
-                else:
-                    sections.append(header_lines)
-                sections.append(render_overall_section(report))
-
-            suggestions_lines = render_suggestions(report.suggestions)
-            if suggestions_lines:
-                sections.append(suggestions_lines)
-
-            for idx, section in enumerate(sections):
-                chunks = self._markdown_chunks(section)
-                for chunk_index, (chunk_text, chunk_entities) in enumerate(chunks):
-                    is_last_section = idx == len(sections) - 1
-                    is_last_chunk = chunk_index == len(chunks) - 1
-                    markup = await self._main_keyboard_for(user_id) if (is_last_section and is_last_chunk) else None
-                    await self._application.bot.send_message(
-                        chat_id=user_id,
-                        text=chunk_text,
-                        entities=chunk_entities,
-                        disable_web_page_preview=True,
-                        reply_markup=markup,
-                    )
-
-            await self._store.increment_usage(daily=1)
+            await self._store.mark_outbox_sent(row["id"])
+            # The keyboard rides on the final chunk, so it marks a fully delivered report.
+            if row["with_keyboard"]:
+                self._usage.record_report("telegram", "daily")
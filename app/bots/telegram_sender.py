@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+from typing import Dict, List
+
+from telegram import Bot
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+logger = logging.getLogger(__name__)
+
+# Telegram allows roughly 30 messages/s per bot, about 1 message/s per private
+# chat (short bursts are tolerated) and 20 messages/min per group.
+GLOBAL_RATE_PER_SECOND = 30.0
+PRIVATE_CHAT_RATE_PER_SECOND = 1.0
+PRIVATE_CHAT_BURST = 3.0
+GROUP_CHAT_RATE_PER_SECOND = 20.0 / 60.0
+MAX_NETWORK_RETRIES = 3
+MAX_IDLE_CHAT_BUCKETS = 10000
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+class TelegramSender:
+    def __init__(self, bot: Bot) -> None:
+        self._bot = bot
+        self._global_bucket = TokenBucket(GLOBAL_RATE_PER_SECOND, GLOBAL_RATE_PER_SECOND)
+        self._chat_buckets: Dict[str, TokenBucket] = {}
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._workers: Dict[str, asyncio.Task] = {}
+        self._paused_until = 0.0
+
+    def _chat_bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if str(chat_id).startswith("-"):
+                bucket = TokenBucket(GROUP_CHAT_RATE_PER_SECOND, 1.0)
+            else:
+                bucket = TokenBucket(PRIVATE_CHAT_RATE_PER_SECOND, PRIVATE_CHAT_BURST)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def submit(self, chat_id: str, messages: List[dict]) -> asyncio.Future:
+        chat_id = str(chat_id)
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.setdefault(chat_id, asyncio.Queue())
+        queue.put_nowait((messages, future))
+        worker = self._workers.get(chat_id)
+        if worker is None or worker.done():
+            self._workers[chat_id] = asyncio.create_task(self._chat_worker(chat_id, queue))
+        return future
+
+    async def send(self, chat_id: str, messages: List[dict]) -> None:
+        await self.submit(chat_id, messages)
+
+    async def send_message(self, chat_id: str, **kwargs) -> None:
+        await self.submit(chat_id, [kwargs])
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    async def _chat_worker(self, chat_id: str, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            messages, future = queue.get_nowait()
+            try:
+                for message in messages:
+                    await self._deliver(chat_id, message)
+            except Exception as exc:
+                if not future.done():
+                    future.set_exception(exc)
+            else:
+                if not future.done():
+                    future.set_result(None)
+        if self._queues.get(chat_id) is queue and queue.empty():
+            del self._queues[chat_id]
+            self._workers.pop(chat_id, None)
+        if len(self._chat_buckets) > MAX_IDLE_CHAT_BUCKETS:
+            self._chat_buckets = {cid: b for cid, b in self._chat_buckets.items() if cid in self._workers}
+
+    async def _wait_for_pause(self) -> None:
+        while True:
+            delay = self._paused_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def _deliver(self, chat_id: str, message: dict) -> None:
+        network_failures = 0
+        chat_bucket = self._chat_bucket(chat_id)
+        while True:
+            await self._wait_for_pause()
+            await chat_bucket.acquire()
+            await self._global_bucket.acquire()
+            try:
+                await self._bot.send_message(chat_id=chat_id, **message)
+                return
+            except BadRequest:
+                raise
+            except RetryAfter as exc:
+                retry_after = _retry_after_seconds(exc.retry_after)
+                logger.warning("Telegram flood control: pausing sends for %.1fs", retry_after)
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            except (TimedOut, NetworkError) as exc:
+                network_failures += 1
+                if network_failures > MAX_NETWORK_RETRIES:
+                    raise
+                logger.warning("Telegram send to %s failed (%s); retrying", chat_id, exc)
+                await asyncio.sleep(2 ** network_failures)
+
+
+def _retry_after_seconds(value) -> float:
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 1.0
@@ -0,0 +1,181 @@
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from web3 import Web3
+
+from .chains import SUPPORTED_CHAINS
+
+logger = logging.getLogger(__name__)
+
+VaultKey = Tuple[int, str]
+
+
+def _to_decimal(value, default: Decimal = Decimal("0")) -> Decimal:
+    if value is None or value == "":
+        return default
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError, TypeError):
+        return default
+
+
+def _primary_apr(apr_data: dict) -> float:
+    points = apr_data.get("points", {}) or {}
+    for value in (apr_data.get("netAPR"), points.get("weekAgo"), points.get("monthAgo")):
+        if value is not None:
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return 0.0
+    return 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class VaultRecord:
+    order: int
+    chain_id: int
+    address: str
+    address_lower: str
+    name: str
+    display_name: str
+    token_symbol: str
+    token_raw_symbol: str
+    token_address_lower: str
+    decimals: int
+    price_per_share: Optional[Decimal]
+    token_price: Decimal
+    tvl_usd: Decimal
+    net_apr_percent: Decimal
+    sort_apr: float
+    kind: str
+    retired: bool
+    yearn_staking_available: bool
+    yearn_gauge_lower: Optional[str]
+    yearn_staking_apr_percent: Decimal
+    vault_url: str
+
+    @property
+    def key(self) -> VaultKey:
+        return (self.chain_id, self.address_lower)
+
+    @classmethod
+    def from_ydaemon(cls, order: int, vault: dict) -> Optional["VaultRecord"]:
+        address = vault.get("address")
+        chain_id = vault.get("chainID")
+        if not address or not chain_id:
+            return None
+
+        name = vault.get("name", "Unknown")
+        token_data = vault.get("token", {}) or {}
+        staking = vault.get("staking", {}) or {}
+        apr_data = vault.get("apr", {}) or {}
+
+        try:
+            decimals = int(vault.get("decimals", 18))
+        except (TypeError, ValueError):
+            logger.error("Invalid decimals for vault %s", address)
+            return None
+
+        price_per_share = None
+        if vault.get("pricePerShare") is not None:
+            raw_pps = _to_decimal(vault.get("pricePerShare"), None)
+            if raw_pps is not None:
+                price_per_share = raw_pps / (Decimal(10) ** decimals)
+
+        yearn_staking_available = bool(staking.get("available", False))
+        yearn_gauge_lower = None
+        if yearn_staking_available and staking.get("address") and Web3.is_address(staking["address"]):
+            yearn_gauge_lower = staking["address"].lower()
+
+        yearn_staking_apr_percent = Decimal("0")
+        if yearn_staking_available:
+            rewards_list = staking.get("rewards") or []
+            apr_extra = apr_data.get("extra") or {}
+            yrn_apr_val = None
+            if rewards_list and rewards_list[0].get("apr") is not None:
+                yrn_apr_val = rewards_list[0]["apr"]
+            elif apr_extra.get("stakingRewardsAPR") is not None:
+                yrn_apr_val = apr_extra["stakingRewardsAPR"]
+            yearn_staking_apr_percent = _to_decimal(yrn_apr_val) * Decimal("100")
+
+        return cls(
+            order=order,
+            chain_id=chain_id,
+            address=address,
+            address_lower=address.lower(),
+            name=name,
+            display_name=vault.get("display_name") or name,
+            token_symbol=token_data.get("display_name") or token_data.get("symbol") or "Asset",
+            token_raw_symbol=token_data.get("symbol", "?"),
+            token_address_lower=(token_data.get("address") or "").lower(),
+            decimals=decimals,
+            price_per_share=price_per_share,
+            token_price=_to_decimal((vault.get("tvl", {}) or {}).get("price")),
+            tvl_usd=_to_decimal((vault.get("tvl", {}) or {}).get("tvl")),
+            net_apr_percent=_to_decimal(apr_data.get("netAPR")) * Decimal("100"),
+            sort_apr=_primary_apr(apr_data),
+            kind=vault.get("kind", ""),
+            retired=bool((vault.get("info", {}) or {}).get("retired", False)),
+            yearn_staking_available=yearn_staking_available,
+            yearn_gauge_lower=yearn_gauge_lower,
+            yearn_staking_apr_percent=yearn_staking_apr_percent,
+            vault_url=f"https://yearn.fi/v3/{chain_id}/{address}",
+        )
+
+
+class VaultCatalog:
+    def __init__(self, records: Iterable[VaultRecord], one_up_gauge_map: Optional[Mapping[str, str]] = None) -> None:
+        self.records: Tuple[VaultRecord, ...] = tuple(records)
+        self.by_key: Dict[VaultKey, VaultRecord] = {}
+        self.by_chain: Dict[int, List[VaultRecord]] = {}
+        self.by_underlying: Dict[VaultKey, List[VaultRecord]] = {}
+        self.by_yearn_gauge: Dict[VaultKey, VaultRecord] = {}
+        self.by_one_up_gauge: Dict[str, VaultRecord] = {}
+        self.one_up_gauge_by_vault: Dict[str, str] = {}
+
+        for record in self.records:
+            self.by_key.setdefault(record.key, record)
+            self.by_chain.setdefault(record.chain_id, []).append(record)
+            if record.token_address_lower:
+                self.by_underlying.setdefault((record.chain_id, record.token_address_lower), []).append(record)
+            if record.yearn_gauge_lower:
+                self.by_yearn_gauge.setdefault((record.chain_id, record.yearn_gauge_lower), record)
+
+        # 1UP gauges only exist on Ethereum and map gauge -> vault.
+        for gauge_lower, vault_lower in (one_up_gauge_map or {}).items():
+            record = self.by_key.get((1, vault_lower))
+            if record is None:
+                continue
+            self.by_one_up_gauge[gauge_lower] = record
+            self.one_up_gauge_by_vault[vault_lower] = gauge_lower
+
+        self._balance_tokens: Dict[int, List[str]] = {}
+        for chain_id in SUPPORTED_CHAINS:
+            tokens = [record.address_lower for record in self.by_chain.get(chain_id, [])]
+            tokens.extend(gauge for (gauge_chain, gauge) in self.by_yearn_gauge if gauge_chain == chain_id)
+            if chain_id == 1:
+                tokens.extend(self.by_one_up_gauge.keys())
+            self._balance_tokens[chain_id] = tokens
+
+    @classmethod
+    def from_ydaemon(cls, data: Iterable[dict]) -> "VaultCatalog":
+        records = []
+        for order, vault in enumerate(data):
+            record = VaultRecord.from_ydaemon(order, vault)
+            if record is not None:
+                records.append(record)
+        return cls(records)
+
+    def with_one_up_gauges(self, one_up_gauge_map: Optional[Mapping[str, str]]) -> "VaultCatalog":
+        return VaultCatalog(self.records, one_up_gauge_map)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def get(self, chain_id: int, address: str) -> Optional[VaultRecord]:
+        return self.by_key.get((chain_id, address.lower()))
+
+    def balance_tokens(self, chain_id: int) -> List[str]:
+        return self._balance_tokens.get(chain_id, [])
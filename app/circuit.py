@@ -0,0 +1,131 @@
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+WINDOW_SECONDS = 60.0
+MIN_CALLS = 5
+FAILURE_RATE_THRESHOLD = 0.5
+COOLDOWN_SECONDS = 30.0
+MAX_COOLDOWN_SECONDS = 300.0
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = WINDOW_SECONDS,
+        min_calls: int = MIN_CALLS,
+        failure_rate_threshold: float = FAILURE_RATE_THRESHOLD,
+        cooldown_seconds: float = COOLDOWN_SECONDS,
+    ) -> None:
+        self.name = name
+        self._window_seconds = window_seconds
+        self._min_calls = max(1, min_calls)
+        self._threshold = failure_rate_threshold
+        self._base_cooldown = cooldown_seconds
+        self._cooldown = cooldown_seconds
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    @property
+    def blocked(self) -> bool:
+        return self._state == OPEN and time.monotonic() - self._opened_at < self._cooldown
+
+    def failure_rate(self) -> float:
+        self._trim(time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for _ts, ok in self._outcomes if not ok) / len(self._outcomes)
+
+    def allow(self) -> bool:
+        if self._state == CLOSED:
+            return True
+        if self._state == OPEN:
+            if self.blocked:
+                return False
+            self._state = HALF_OPEN
+            self._probing = False
+            logger.info("Circuit %s half-open; probing", self.name)
+        # Half-open lets a single probe through; everyone else keeps failing fast until it reports back.
+        now = time.monotonic()
+        if self._probing and now - self._probe_started < self._cooldown:
+            return False
+        self._probing = True
+        self._probe_started = now
+        return True
+
+    def record_success(self) -> None:
+        if self._state == HALF_OPEN:
+            logger.info("Circuit %s closed", self.name)
+            self._state = CLOSED
+            self._probing = False
+            self._cooldown = self._base_cooldown
+            self._outcomes.clear()
+            return
+        self._record(True)
+
+    def record_failure(self) -> None:
+        if self._state == HALF_OPEN:
+            # Repeated failed probes back off so a long outage is not hammered every cooldown.
+            self._open(min(self._cooldown * 2, MAX_COOLDOWN_SECONDS))
+            return
+        if self._state == OPEN:
+            return
+        self._record(False)
+        if len(self._outcomes) >= self._min_calls and self.failure_rate() >= self._threshold:
+            self._open(self._base_cooldown)
+
+    def _record(self, ok: bool) -> None:
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        self._trim(now)
+
+    def _trim(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self._window_seconds:
+            self._outcomes.popleft()
+
+    def _open(self, cooldown: float) -> None:
+        self._state = OPEN
+        self._probing = False
+        self._opened_at = time.monotonic()
+        self._cooldown = cooldown
+        logger.warning(
+            "Circuit %s open for %.0fs (failure rate %.0f%%)", self.name, cooldown, self.failure_rate() * 100
+        )
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def circuit_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        breaker = CircuitBreaker(name)
+        _breakers[name] = breaker
+    return breaker
+
+
+def breaker_states(include_closed: bool = False) -> Dict[str, str]:
+    return {
+        name: breaker.state
+        for name, breaker in sorted(_breakers.items())
+        if include_closed or breaker.state != CLOSED
+    }
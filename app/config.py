@@ -2,6 +2,7 @@ import os
 from dataclasses import dataclass
 from decimal import Decimal, InvalidOperation
 from datetime import time
+from typing import Dict, Tuple
 
 def _parse_bool(value: str, default: bool) -> bool:
     if value is None:
@@ -36,6 +37,21 @@ def _parse_time_hhmm(value: str, default: time) -> time:
         return default
     return default
 
+def _parse_rpc_urls(value: str) -> Dict[int, Tuple[str, ...]]:
+    urls: Dict[int, Tuple[str, ...]] = {}
+    if not value:
+        return urls
+    for group in value.split(";"):
+        chain, _, url_list = group.partition("=")
+        try:
+            chain_id = int(chain.strip())
+        except ValueError:
+            continue
+        parsed = tuple(url.strip() for url in url_list.split(",") if url.strip())
+        if parsed:
+            urls[chain_id] = urls.get(chain_id, ()) + parsed
+    return urls
+
 def _parse_decimal(value: str, default: Decimal) -> Decimal:
     if value is None:
         return default
@@ -60,8 +76,26 @@ class Config:
     enable_discord: bool
     veyfi_deprecation_message: str
     db_path: str
+    db_read_connections: int
+    store_cache_max_entries: int
+    usage_flush_seconds: int
+    cache_snapshot_path: str
     min_suggestion_tvl_usd: Decimal
     suggestion_apr_threshold: Decimal
+    balance_cache_ttl_seconds: int
+    balance_cache_max_entries: int
+    balance_stale_max_seconds: int
+    report_cache_max_entries: int
+    daily_report_concurrency: int
+    daily_report_window_minutes: int
+    daily_report_workers: int
+    daily_prewarm_minutes: int
+    rpc_timeout_seconds: int
+    report_deadline_seconds: int
+    report_followup_seconds: int
+    report_workers: int
+    report_queue_max_depth: int
+    rpc_urls: Dict[int, Tuple[str, ...]]
 
 
 def load_config() -> Config:
@@ -87,6 +121,24 @@ def load_config() -> Config:
             "veYFI staking is deprecated. If you have Yearn gauge deposits, consider unstaking and migrating per Yearn guidance.",
         ).strip(),
         db_path=os.environ.get("DB_PATH", "yport.db"),
+        db_read_connections=max(1, _parse_int(os.environ.get("DB_READ_CONNECTIONS"), 4)),
+        store_cache_max_entries=max(1, _parse_int(os.environ.get("STORE_CACHE_MAX_ENTRIES"), 50000)),
+        usage_flush_seconds=max(1, _parse_int(os.environ.get("USAGE_FLUSH_SECONDS"), 60)),
+        rpc_timeout_seconds=max(1, _parse_int(os.environ.get("RPC_TIMEOUT_SECONDS"), 10)),
+        report_deadline_seconds=max(1, _parse_int(os.environ.get("REPORT_DEADLINE_SECONDS"), 20)),
+        report_followup_seconds=max(1, _parse_int(os.environ.get("REPORT_FOLLOWUP_SECONDS"), 90)),
+        report_workers=max(1, _parse_int(os.environ.get("REPORT_WORKERS"), 4)),
+        report_queue_max_depth=max(1, _parse_int(os.environ.get("REPORT_QUEUE_MAX_DEPTH"), 100)),
+        rpc_urls=_parse_rpc_urls(os.environ.get("RPC_URLS", "")),
+        cache_snapshot_path=os.environ.get("CACHE_SNAPSHOT_PATH", "yport_cache.json.gz").strip(),
         min_suggestion_tvl_usd=_parse_decimal(os.environ.get("MIN_SUGGESTION_TVL_USD"), Decimal("50000")),
         suggestion_apr_threshold=_parse_decimal(os.environ.get("SUGGESTION_APR_THRESHOLD"), Decimal("5.0")),
+        balance_cache_ttl_seconds=max(1, _parse_int(os.environ.get("BALANCE_CACHE_TTL_SECONDS"), 60)),
+        balance_cache_max_entries=max(1, _parse_int(os.environ.get("BALANCE_CACHE_MAX_ENTRIES"), 10000)),
+        balance_stale_max_seconds=max(0, _parse_int(os.environ.get("BALANCE_STALE_MAX_SECONDS"), 1800)),
+        report_cache_max_entries=max(1, _parse_int(os.environ.get("REPORT_CACHE_MAX_ENTRIES"), 1000)),
+        daily_report_concurrency=max(1, _parse_int(os.environ.get("DAILY_REPORT_CONCURRENCY"), 8)),
+        daily_report_window_minutes=max(0, _parse_int(os.environ.get("DAILY_REPORT_WINDOW_MINUTES"), 60)),
+        daily_report_workers=max(1, _parse_int(os.environ.get("DAILY_REPORT_WORKERS"), 2)),
+        daily_prewarm_minutes=max(0, _parse_int(os.environ.get("DAILY_PREWARM_MINUTES"), 10)),
     )
@@ -2,6 +2,7 @@ from decimal import Decimal
 from typing import List
 
 from ..report import ReportData, SuggestionEntry, format_tvl, ChainReport, VaultEntry
+from ..chains import CHAIN_NAMES
 from ..config import Config
 
 
@@ -16,6 +17,13 @@ def escape_markdown(text: str) -> str:
     return result
 
 
+def _delayed_lines(report: ReportData) -> List[str]:
+    if not report.delayed_chains:
+        return []
+    names = ", ".join(CHAIN_NAMES.get(chain_id, str(chain_id)) for chain_id in report.delayed_chains)
+    return [f"⏳ *Data delayed for {escape_markdown(names)}. Try again shortly for the full report.*"]
+
+
 def _format_money(value: Decimal) -> str:
     return f"${value:,.2f}"
 
@@ -34,6 +42,7 @@ def render_report(report: ReportData, config: Config) -> List[str]:
 
     if report.empty:
         lines.append("*No Yearn vault holdings found for the provided addresses.*")
+        lines.extend(_delayed_lines(report))
         lines.append(f"*{escape_markdown(report.cache_note)}*")
         return lines
 
@@ -91,6 +100,7 @@ def render_report(report: ReportData, config: Config) -> List[str]:
     else:
         lines.append("*No Yearn vault holdings found for the provided addresses.*")
 
+    lines.extend(_delayed_lines(report))
     lines.append(f"*{escape_markdown(report.cache_note)}*")
     return lines
 
@@ -173,6 +183,7 @@ def render_overall_section(report: ReportData) -> List[str]:
         )
     else:
         lines.append("*No Yearn vault holdings found for the provided addresses.*")
+    lines.extend(_delayed_lines(report))
     lines.append(f"*{escape_markdown(report.cache_note)}*")
     return lines
 
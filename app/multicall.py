@@ -0,0 +1,115 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from eth_abi import decode, encode
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")
+ASSET_SELECTOR = bytes.fromhex("38d52e0f")
+ENS_RESOLVER_SELECTOR = bytes.fromhex("0178b8bf")
+ENS_ADDR_SELECTOR = bytes.fromhex("3b3b57de")
+
+# Keeps a single eth_call comfortably below common provider request size and gas caps.
+MAX_CALLDATA_BYTES = 32 * 1024
+# Head offset, target, allowFailure, bytes offset and length words per Call3 tuple.
+CALL3_OVERHEAD_BYTES = 5 * 32
+
+EthCall = Callable[[str, bytes], Awaitable[bytes]]
+
+
+class MulticallError(Exception):
+    pass
+
+
+def balance_of_calldata(owner: str) -> bytes:
+    return BALANCE_OF_SELECTOR + encode(["address"], [Web3.to_checksum_address(owner)])
+
+
+def decode_uint(data: Optional[bytes]) -> Optional[int]:
+    if not data or len(data) < 32:
+        return None
+    return int.from_bytes(data[:32], "big")
+
+
+def decode_address(data: Optional[bytes]) -> Optional[str]:
+    if not data or len(data) < 32:
+        return None
+    return Web3.to_checksum_address(data[12:32])
+
+
+def _call_size(calldata: bytes) -> int:
+    return CALL3_OVERHEAD_BYTES + ((len(calldata) + 31) // 32) * 32
+
+
+def chunk_calls(calls: Sequence[Tuple[str, bytes]], max_calldata_bytes: int = MAX_CALLDATA_BYTES) -> List[List[int]]:
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    current_size = 0
+    for idx, (_target, calldata) in enumerate(calls):
+        size = _call_size(calldata)
+        if current and current_size + size > max_calldata_bytes:
+            chunks.append(current)
+            current = []
+            current_size = 0
+        current.append(idx)
+        current_size += size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def encode_aggregate3(calls: Sequence[Tuple[str, bytes]]) -> bytes:
+    payload = [(Web3.to_checksum_address(target), True, calldata) for target, calldata in calls]
+    return AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [payload])
+
+
+def decode_aggregate3(data: bytes) -> List[Tuple[bool, bytes]]:
+    (results,) = decode(["(bool,bytes)[]"], data)
+    return [(bool(success), bytes(return_data)) for success, return_data in results]
+
+
+async def aggregate3(
+    eth_call: EthCall,
+    calls: Sequence[Tuple[str, bytes]],
+    chain_id: int,
+    max_calldata_bytes: int = MAX_CALLDATA_BYTES,
+    concurrency: int = 4,
+) -> List[Optional[bytes]]:
+    results: List[Optional[bytes]] = [None] * len(calls)
+    if not calls:
+        return results
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_chunk(indices: List[int]) -> None:
+        chunk = [calls[i] for i in indices]
+        async with semaphore:
+            raw = await eth_call(MULTICALL3_ADDRESS, encode_aggregate3(chunk))
+        try:
+            decoded = decode_aggregate3(raw)
+        except Exception as exc:
+            raise MulticallError(f"Undecodable Multicall3 response on chain {chain_id}: {exc}") from exc
+        if len(decoded) != len(indices):
+            raise MulticallError(
+                f"Multicall3 returned {len(decoded)} results for {len(indices)} calls on chain {chain_id}"
+            )
+        for idx, (success, return_data) in zip(indices, decoded):
+            if success:
+                results[idx] = return_data
+
+    # A failed chunk means the results are unknown rather than empty, so the whole read fails.
+    outcomes = await asyncio.gather(
+        *[run_chunk(indices) for indices in chunk_calls(calls, max_calldata_bytes)],
+        return_exceptions=True,
+    )
+    errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    if errors:
+        logger.warning("%s of %s Multicall3 chunks failed on chain %s: %s", len(errors), len(outcomes), chain_id, errors[0])
+        raise errors[0]
+    return results
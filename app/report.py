@@ -1,15 +1,23 @@
 import asyncio
 import logging
-from dataclasses import dataclass
-from datetime import datetime, timedelta, timezone
+import time
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
 from decimal import Decimal, InvalidOperation, getcontext
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 from web3 import Web3
 
-from .balances import fetch_balances_for_eoa_on_chain
+from .balances import BalanceFetchError, fetch_balances_for_eoas_on_chain
+from .catalog import VaultCatalog, VaultRecord
+from .circuit import CircuitOpenError
 from .chains import CHAIN_NAMES, SUPPORTED_CHAINS
-from .yearn_api import YearnApi
+from .multicall import MulticallError
+from .rpc import RpcError
+from .singleflight import SingleFlight
+from .ttl_cache import TTLCache
+from .yearn_api import CacheGeneration, YearnApi
+from .yields import YieldStats
 from .web3_utils import Web3Manager
 from .http import SharedHttpClient
 from .config import Config
@@ -17,6 +25,15 @@ from .config import Config
 logger = logging.getLogger(__name__)
 getcontext().prec = 28
 
+# EOAs packed into one Multicall3 balance read during batch runs.
+BATCH_BALANCE_GROUP_SIZE = 25
+# Share of the report deadline given to balance reads; yield data gets the rest.
+BALANCE_STAGE_SHARE = 0.7
+
+ReportKey = Tuple[Tuple[str, ...], int, int]
+# Failures meaning no balance source answered for a chain, as opposed to a bug in the read itself.
+BALANCE_UNAVAILABLE_ERRORS = (CircuitOpenError, RpcError, MulticallError, BalanceFetchError)
+
 
 @dataclass
 class VaultEntry:
@@ -67,6 +84,14 @@ class SuggestionEntry:
     apr_difference: Decimal
     tvl: Decimal
 
+
+@dataclass
+class ChainBalances:
+    balances: Dict[str, Dict[str, str]]
+    # Lowercased EOAs served from expired cache entries because no balance source answered.
+    stale: set[str] = field(default_factory=set)
+
+
 @dataclass
 class ReportData:
     chains: List[ChainReport]
@@ -75,6 +100,21 @@ class ReportData:
     cache_note: str
     has_yearn_gauge_deposit: bool
     empty: bool
+    delayed_chains: List[int] = field(default_factory=list)
+
+    @property
+    def partial(self) -> bool:
+        return bool(self.delayed_chains)
+
+    def copy(self) -> "ReportData":
+        # Top-level lists are copied for callers; the chain and suggestion entries themselves stay shared.
+        return replace(
+            self,
+            chains=list(self.chains),
+            suggestions=list(self.suggestions),
+            delayed_chains=list(self.delayed_chains),
+        )
+
 
 class ReportService:
     def __init__(self, config: Config, yearn_api: YearnApi, web3_manager: Web3Manager, http_client: SharedHttpClient) -> None:
@@ -82,158 +122,223 @@ class ReportService:
         self._yearn = yearn_api
         self._web3 = web3_manager
         self._http = http_client
+        self._flights = SingleFlight()
+        self._balance_cache: TTLCache[Tuple[int, str], Dict[str, str]] = TTLCache(
+            config.balance_cache_max_entries,
+            config.balance_cache_ttl_seconds,
+        )
+        self._report_cache: TTLCache[ReportKey, ReportData] = TTLCache(config.report_cache_max_entries)
+        self._report_generation = 0
 
-    async def generate(self, addresses: List[str]) -> ReportData:
-        all_vaults = self._yearn.get_ydaemon_data()
-        one_up_data = self._yearn.get_1up_data()
-        one_up_gauge_map = self._yearn.get_1up_gauge_map()
-
-        if not all_vaults:
+    def _current_generation(self) -> CacheGeneration:
+        self._yearn.refresh_if_stale()
+        generation = self._yearn.snapshot()
+        if not generation.catalog:
             raise RuntimeError("Vault data unavailable")
-
-        one_up_vault_to_gauge = {v: k for k, v in (one_up_gauge_map or {}).items()}
+        return generation
+
+    async def generate(self, addresses: List[str], deadline: Optional[float] = None) -> ReportData:
+        budget = deadline if deadline is not None else self._config.report_deadline_seconds
+        started = time.monotonic()
+        generation = self._current_generation()
+        if generation.generation != self._report_generation:
+            # A refresh published new API data; reports built on the old generation can never be served again.
+            self._report_generation = generation.generation
+            self._report_cache.invalidate(lambda stale: stale[1] != generation.generation)
+        key = self._report_key(addresses, generation)
+        cached = self._report_cache.get(key)
+        if cached is not None:
+            return cached.copy()
+        # Balance reads run as independent tasks so a chain that misses its deadline keeps going in the
+        # background and fills the balance cache for a follow-up report.
+        tasks = {
+            chain_id: asyncio.ensure_future(self._fetch_chain_balances(chain_id, addresses, generation.catalog))
+            for chain_id in SUPPORTED_CHAINS
+        }
+        for task in tasks.values():
+            task.add_done_callback(_consume_task_exception)
+        await asyncio.wait(tasks.values(), timeout=budget * BALANCE_STAGE_SHARE)
 
         balances_by_chain: Dict[int, Dict[str, Dict[str, str]]] = {}
-        balance_tasks = []
-        w3_instances: Dict[int, Web3] = {}
-
-        for chain_id in SUPPORTED_CHAINS:
-            balances_by_chain[chain_id] = {}
-            if chain_id != 1:
-                w3 = self._web3.get_instance(chain_id)
-                if w3:
-                    w3_instances[chain_id] = w3
-            for eoa in addresses:
-                balances_by_chain[chain_id][eoa] = {}
-                balance_tasks.append(
-                    fetch_balances_for_eoa_on_chain(
-                        eoa=eoa,
-                        chain_id=chain_id,
-                        vaults_data=all_vaults,
-                        w3_instance=w3_instances.get(chain_id),
-                        session=self._http.session,
-                        api_key=self._config.alchemy_api_key,
-                    )
-                )
-
-        results = await asyncio.gather(*balance_tasks, return_exceptions=True)
-        idx = 0
-        for chain_id in SUPPORTED_CHAINS:
-            for eoa in addresses:
-                result = results[idx]
-                if isinstance(result, dict):
-                    balances_by_chain[chain_id][eoa] = result
-                else:
-                    balances_by_chain[chain_id][eoa] = {}
-                idx += 1
+        delayed_chains: List[int] = []
+        for chain_id, task in tasks.items():
+            if not task.done():
+                logger.warning("Balance fetch on chain %s missed the report deadline", chain_id)
+                delayed_chains.append(chain_id)
+                balances_by_chain[chain_id] = {}
+            elif isinstance(task.exception(), BALANCE_UNAVAILABLE_ERRORS):
+                logger.warning("Balances unavailable on chain %s: %s", chain_id, task.exception())
+                delayed_chains.append(chain_id)
+                balances_by_chain[chain_id] = {}
+            elif task.exception() is not None:
+                logger.error("Balance fetch failed on chain %s: %s", chain_id, task.exception())
+                delayed_chains.append(chain_id)
+                balances_by_chain[chain_id] = {}
+            else:
+                result = task.result()
+                balances_by_chain[chain_id] = result.balances
+                # Old balances are shown, but flagged as delayed so the report is neither cached nor final.
+                if result.stale:
+                    delayed_chains.append(chain_id)
+
+        yield_deadline = started + budget
+        report = await self._build_report(addresses, balances_by_chain, generation, yield_deadline=yield_deadline)
+        report.delayed_chains = sorted(set(report.delayed_chains) | set(delayed_chains))
+        # Partial reports are never cached so the next request picks up the delayed data.
+        if not report.partial:
+            self._report_cache.set(key, report.copy(), ttl=self._balance_bucket_ttl())
+        return report
+
+    def cached_report(self, addresses: List[str]) -> Optional[ReportData]:
+        cached = self._report_cache.get(self._report_key(addresses, self._yearn.snapshot()))
+        return cached.copy() if cached is not None else None
+
+    def _report_key(self, addresses: Iterable[str], generation: CacheGeneration) -> ReportKey:
+        # Reports follow the balance cache buckets, so a cached report never outlives the balances behind it.
+        bucket = int(time.time() // self._config.balance_cache_ttl_seconds)
+        return tuple(sorted({address.lower() for address in addresses})), generation.generation, bucket
+
+    async def generate_many(
+        self,
+        address_sets: Dict[str, List[str]],
+        concurrency: int = 8,
+    ) -> Dict[str, object]:
+        generation = self._current_generation()
+        catalog = generation.catalog
+
+        unique_eoas: Dict[str, str] = {}
+        for addresses in address_sets.values():
+            for address in addresses:
+                unique_eoas.setdefault(address.lower(), address)
+        eoas = list(unique_eoas.values())
+
+        shared, failed = await self._prefetch_balances(eoas, catalog, concurrency)
+        logger.info("Batch balances fetched for %s unique addresses across %s users", len(eoas), len(address_sets))
+
+        def balances_for(addresses: List[str]) -> Dict[int, Dict[str, Dict[str, str]]]:
+            return {
+                chain_id: {eoa: by_eoa.get(eoa, {}) for eoa in addresses}
+                for chain_id, by_eoa in shared.items()
+            }
+
+        held: set[Tuple[int, str]] = set()
+        for addresses in address_sets.values():
+            held.update((record.chain_id, record.address) for record in collect_holdings(catalog, balances_for(addresses), addresses))
+        yield_table = await self._yearn.get_yield_stats_many(held, generation) if held else {}
+
+        results: Dict[str, object] = {}
+        for user_id, addresses in address_sets.items():
+            try:
+                report = await self._build_report(addresses, balances_for(addresses), generation, yield_table)
+                lowered = {address.lower() for address in addresses}
+                failed_chains = {chain_id for chain_id, failed_eoas in failed.items() if not lowered.isdisjoint(failed_eoas)}
+                report.delayed_chains = sorted(set(report.delayed_chains) | failed_chains)
+                results[user_id] = report
+            except Exception as exc:
+                logger.error("Batch report assembly failed for %s: %s", user_id, exc)
+                results[user_id] = exc
+        return results
+
+    async def prewarm(self, address_sets: Iterable[List[str]], hold_seconds: float, concurrency: int = 8) -> None:
+        await self._yearn.refresh_ahead(hold_seconds)
+        generation = self._current_generation()
+        unique_eoas: Dict[str, str] = {}
+        for addresses in address_sets:
+            for address in addresses:
+                unique_eoas.setdefault(address.lower(), address)
+        if not unique_eoas:
+            return
+        eoas = list(unique_eoas.values())
+        await self._prefetch_balances(eoas, generation.catalog, concurrency, ttl=hold_seconds)
+        logger.info("Pre-warmed balances for %s addresses (held %.0fs)", len(eoas), hold_seconds)
+
+    async def _prefetch_balances(
+        self,
+        eoas: List[str],
+        catalog: VaultCatalog,
+        concurrency: int,
+        ttl: Optional[float] = None,
+    ) -> Tuple[Dict[int, Dict[str, Dict[str, str]]], Dict[int, set[str]]]:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        shared: Dict[int, Dict[str, Dict[str, str]]] = {chain_id: {} for chain_id in SUPPORTED_CHAINS}
+        # Lowercased EOAs whose balances could not be read fresh, per chain.
+        failed: Dict[int, set[str]] = {}
+
+        async def fetch_group(chain_id: int, group: List[str]) -> None:
+            async with semaphore:
+                try:
+                    result = await self._fetch_chain_balances(chain_id, group, catalog, ttl)
+                    shared[chain_id].update(result.balances)
+                    if result.stale:
+                        failed.setdefault(chain_id, set()).update(result.stale)
+                except Exception as exc:
+                    logger.error("Batch balance fetch failed on chain %s: %s", chain_id, exc)
+                    failed.setdefault(chain_id, set()).update(eoa.lower() for eoa in group)
+
+        await asyncio.gather(
+            *[
+                fetch_group(chain_id, eoas[start : start + BATCH_BALANCE_GROUP_SIZE])
+                for chain_id in SUPPORTED_CHAINS
+                for start in range(0, len(eoas), BATCH_BALANCE_GROUP_SIZE)
+            ]
+        )
+        return shared, failed
+
+    async def _build_report(
+        self,
+        addresses: List[str],
+        balances_by_chain: Dict[int, Dict[str, Dict[str, str]]],
+        generation: CacheGeneration,
+        yield_table: Optional[Dict[Tuple[int, str], YieldStats]] = None,
+        yield_deadline: Optional[float] = None,
+    ) -> ReportData:
+        catalog = generation.catalog
+        one_up_data = generation.one_up.data
+        holdings = collect_holdings(catalog, balances_by_chain, addresses)
 
         portfolio_by_chain: Dict[int, Dict[str, object]] = {}
         report_vaults_details = []
         vaults_requiring_kong: set[Tuple[int, str]] = set()
         has_yearn_gauge_deposit = False
 
-        for vault in all_vaults:
-            vault_address_lower = vault.get("address", "").lower()
-            chain_id = vault.get("chainID")
-            if not vault_address_lower or not chain_id or chain_id not in SUPPORTED_CHAINS:
-                continue
-
-            yearn_gauge_address_lower = None
-            yearn_staking_available = vault.get("staking", {}).get("available", False)
-            if yearn_staking_available and vault.get("staking", {}).get("address"):
-                yg_addr = vault["staking"]["address"]
-                if Web3.is_address(yg_addr):
-                    yearn_gauge_address_lower = Web3.to_checksum_address(yg_addr).lower()
-
-            one_up_gauge_address_lower = one_up_vault_to_gauge.get(vault_address_lower)
-            one_up_staking_available = one_up_gauge_address_lower is not None
-
-            vault_balance_hex = "0x0"
-            yearn_gauge_balance_hex = "0x0"
-            one_up_gauge_balance_hex = "0x0"
-
-            for eoa in addresses:
-                eoa_balances = balances_by_chain.get(chain_id, {}).get(eoa, {})
-                bal = eoa_balances.get(vault_address_lower)
-                if bal and int(bal, 16) > 0:
-                    vault_balance_hex = hex(int(vault_balance_hex, 16) + int(bal, 16))
-                if yearn_gauge_address_lower:
-                    bal = eoa_balances.get(yearn_gauge_address_lower)
-                    if bal and int(bal, 16) > 0:
-                        yearn_gauge_balance_hex = hex(int(yearn_gauge_balance_hex, 16) + int(bal, 16))
-                if one_up_gauge_address_lower:
-                    bal = eoa_balances.get(one_up_gauge_address_lower)
-                    if bal and int(bal, 16) > 0:
-                        one_up_gauge_balance_hex = hex(int(one_up_gauge_balance_hex, 16) + int(bal, 16))
-
-            potential_yearn_staking_apr = Decimal("0")
-            if yearn_staking_available:
-                rewards_list = vault.get("staking", {}).get("rewards", [])
-                apr_extra = vault.get("apr", {}).get("extra", {})
-                yrn_apr_val = None
-                if rewards_list and rewards_list[0].get("apr") is not None:
-                    yrn_apr_val = rewards_list[0]["apr"]
-                elif apr_extra and apr_extra.get("stakingRewardsAPR") is not None:
-                    yrn_apr_val = apr_extra["stakingRewardsAPR"]
-                if yrn_apr_val is not None:
-                    try:
-                        potential_yearn_staking_apr = Decimal(yrn_apr_val) * Decimal("100")
-                    except Exception:
-                        pass
-
-            potential_one_up_staking_apr = Decimal("0")
-            if one_up_staking_available and one_up_data:
-                gauge_data = one_up_data.get("gauges", {}).get(one_up_gauge_address_lower)
-                if gauge_data:
-                    one_up_apr_val = gauge_data.get("reward_apr")
-                    if one_up_apr_val is not None:
-                        try:
-                            potential_one_up_staking_apr = Decimal(one_up_apr_val)
-                        except Exception:
-                            pass
+        for record in sorted(holdings, key=lambda r: r.order):
+            vault_balance, yearn_gauge_balance, one_up_gauge_balance = holdings[record]
+            chain_id = record.chain_id
+            one_up_gauge_address_lower = catalog.one_up_gauge_by_vault.get(record.address_lower) if chain_id == 1 else None
 
             staked_status = "none"
-            effective_balance_hex = "0x0"
             current_staking_apr_percent = Decimal("0")
             current_staking_apr_source = ""
 
-            if int(yearn_gauge_balance_hex, 16) > 0:
+            if yearn_gauge_balance > 0:
                 staked_status = "yearn"
-                effective_balance_hex = yearn_gauge_balance_hex
+                effective_balance = yearn_gauge_balance
                 current_staking_apr_source = "Yearn (Max Boost)"
-                current_staking_apr_percent = potential_yearn_staking_apr
+                current_staking_apr_percent = record.yearn_staking_apr_percent
                 has_yearn_gauge_deposit = True
-            elif int(one_up_gauge_balance_hex, 16) > 0:
+            elif one_up_gauge_balance > 0:
                 staked_status = "1up"
-                effective_balance_hex = one_up_gauge_balance_hex
+                effective_balance = one_up_gauge_balance
                 current_staking_apr_source = "1UP"
-                current_staking_apr_percent = potential_one_up_staking_apr
-            elif int(vault_balance_hex, 16) > 0:
-                staked_status = "none"
-                effective_balance_hex = vault_balance_hex
+                current_staking_apr_percent = one_up_staking_apr(one_up_data, one_up_gauge_address_lower)
+            elif vault_balance > 0:
+                effective_balance = vault_balance
             else:
                 continue
 
             try:
-                name = vault.get("name", "Unknown")
-                display_name = vault.get("display_name", name)
-                token_data = vault.get("token", {})
-                token_symbol = token_data.get("display_name") or token_data.get("symbol") or "Asset"
-                underlying_token_address = token_data.get("address", "").lower()
-                decimals = int(vault.get("decimals", 18))
-                price_per_share_str = vault.get("pricePerShare")
-                if price_per_share_str is None:
+                if record.price_per_share is None:
                     continue
-                price_per_share = Decimal(price_per_share_str) / (Decimal(10) ** decimals)
-                underlying_token_price = Decimal(vault.get("tvl", {}).get("price") or "0")
-                effective_balance_int = int(effective_balance_hex, 16)
-                vault_usd_value = (Decimal(effective_balance_int) / (Decimal(10) ** decimals)) * price_per_share * underlying_token_price
+                decimals = record.decimals
+                underlying_token_price = record.token_price
+                vault_usd_value = (
+                    (Decimal(effective_balance) / (Decimal(10) ** decimals)) * record.price_per_share * underlying_token_price
+                )
                 if vault_usd_value < Decimal("0.01"):
                     continue
-                net_apr = vault.get("apr", {}).get("netAPR")
-                vault_apr_percent = Decimal(net_apr or "0") * Decimal("100")
+                vault_apr_percent = record.net_apr_percent
 
-                vaults_requiring_kong.add((chain_id, vault.get("address")))
+                vaults_requiring_kong.add((chain_id, record.address))
 
                 if chain_id not in portfolio_by_chain:
                     portfolio_by_chain[chain_id] = {
@@ -247,9 +352,9 @@ class ReportService:
                     }
 
                 vault_info = {
-                    "display_name": display_name,
-                    "token_symbol": token_symbol,
-                    "vault_url": f"https://yearn.fi/v3/{chain_id}/{vault.get('address')}",
+                    "display_name": record.display_name,
+                    "token_symbol": record.token_symbol,
+                    "vault_url": record.vault_url,
                     "vault_usd_value": vault_usd_value,
                     "vault_apr_percent": vault_apr_percent,
                     "staked_status": staked_status,
@@ -260,9 +365,9 @@ class ReportService:
                     "yield_30d": Decimal("0"),
                     "usd_change_7d": Decimal("0"),
                     "usd_change_30d": Decimal("0"),
-                    "address": vault.get("address"),
-                    "address_lower": vault_address_lower,
-                    "effective_balance_hex": effective_balance_hex,
+                    "address": record.address,
+                    "address_lower": record.address_lower,
+                    "effective_balance_hex": hex(effective_balance),
                     "decimals": decimals,
                     "underlying_token_price": underlying_token_price,
                 }
@@ -280,26 +385,26 @@ class ReportService:
 
                 report_vaults_details.append(
                     {
-                        "address": vault_address_lower,
-                        "underlying_token_address": underlying_token_address,
+                        "address": record.address_lower,
+                        "underlying_token_address": record.token_address_lower,
                         "apr": vault_apr_percent,
                         "chainID": chain_id,
-                        "name": name,
-                        "symbol": token_symbol,
+                        "name": record.name,
+                        "symbol": record.token_symbol,
                     }
                 )
 
             except (KeyError, ValueError, TypeError, InvalidOperation) as exc:
-                logger.error("Error processing vault %s: %s", vault_address_lower, exc)
+                logger.error("Error processing vault %s: %s", record.address_lower, exc)
                 continue
 
-        kong_results: Dict[Tuple[int, str], list] = {}
-        kong_tasks = [self._yearn.get_kong_data(address, cid) for cid, address in vaults_requiring_kong]
-        if kong_tasks:
-            kong_responses = await asyncio.gather(*kong_tasks)
-            for i, (cid, address) in enumerate(vaults_requiring_kong):
-                if kong_responses[i]:
-                    kong_results[(cid, address.lower())] = kong_responses[i]
+        delayed_chains: set[int] = set()
+        if yield_table is None:
+            yield_table = {}
+            if vaults_requiring_kong:
+                yield_table, delayed_chains = await self._yield_stats_within(
+                    vaults_requiring_kong, generation, yield_deadline
+                )
 
         chains: List[ChainReport] = []
         grand_total_usd = Decimal("0")
@@ -314,16 +419,15 @@ class ReportService:
             vault_entries: List[VaultEntry] = []
 
             for vault_info in chain_data["vaults"]:
-                timeseries = kong_results.get((chain_id, vault_info["address_lower"]))
-                if timeseries:
-                    current_pps, pps_7d, pps_30d = process_timeseries_data_with_decimal(timeseries)
-                    yield_7d = calculate_yield_with_decimal(current_pps, pps_7d)
-                    yield_30d = calculate_yield_with_decimal(current_pps, pps_30d)
+                stats = yield_table.get((chain_id, vault_info["address_lower"]))
+                if stats:
+                    yield_7d = stats.yield_7d
+                    yield_30d = stats.yield_30d
                     effective_balance_tokens = Decimal(int(vault_info["effective_balance_hex"], 16)) / (
                         Decimal(10) ** vault_info["decimals"]
                     )
-                    pps_change_7d = current_pps - pps_7d
-                    pps_change_30d = current_pps - pps_30d
+                    pps_change_7d = stats.current_pps - stats.pps_7d
+                    pps_change_30d = stats.current_pps - stats.pps_30d
                     usd_change_7d = Decimal("0")
                     usd_change_30d = Decimal("0")
                     if vault_info["underlying_token_price"] > 0:
@@ -408,9 +512,9 @@ class ReportService:
                 total_usd_change_30d=Decimal("0"),
             )
 
-        suggestions = self._generate_suggestions(report_vaults_details, all_vaults)
+        suggestions = self._generate_suggestions(report_vaults_details, catalog)
 
-        timestamps = self._yearn.cache_timestamps()
+        timestamps = self._yearn.cache_timestamps(generation)
         last_update_ts = max(timestamps.values())
         if last_update_ts:
             last_update_dt = datetime.fromtimestamp(last_update_ts, tz=timezone.utc).strftime("%Y-%m-%d %H:%M %Z")
@@ -430,10 +534,128 @@ class ReportService:
             cache_note=cache_note,
             has_yearn_gauge_deposit=has_yearn_gauge_deposit,
             empty=empty,
+            delayed_chains=sorted(delayed_chains),
         )
 
-    def _generate_suggestions(self, user_vaults_details: list, all_vaults: list) -> List[SuggestionEntry]:
-        if not user_vaults_details or not all_vaults:
+    async def _yield_stats_within(
+        self,
+        vaults: set[Tuple[int, str]],
+        generation: CacheGeneration,
+        deadline: Optional[float],
+    ) -> Tuple[Dict[Tuple[int, str], YieldStats], set[int]]:
+        task = asyncio.ensure_future(self._yearn.get_yield_stats_many(vaults, generation))
+        task.add_done_callback(_consume_task_exception)
+        timeout = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout), set()
+        except asyncio.TimeoutError:
+            pass
+        # Serve whatever yield data is already cached; the fetch keeps running for the next report.
+        yields = self._yearn.snapshot().yields
+        table = {}
+        delayed: set[int] = set()
+        for chain_id, address in vaults:
+            key = (chain_id, address.lower())
+            if key in yields:
+                table[key] = yields[key]
+            else:
+                delayed.add(chain_id)
+        logger.warning("Yield data missed the report deadline; %d vault(s) left without yields", len(vaults) - len(table))
+        return table, delayed
+
+    async def _fetch_chain_balances(
+        self,
+        chain_id: int,
+        addresses: List[str],
+        catalog: VaultCatalog,
+        ttl: Optional[float] = None,
+    ) -> ChainBalances:
+        rpc = self._web3.get_rpc(chain_id)
+
+        async def fetch(keys: List[Tuple[int, str]]) -> Dict[Tuple[int, str], Dict[str, str]]:
+            eoas = [eoa for _chain_id, eoa in keys]
+            balances = await fetch_balances_for_eoas_on_chain(
+                eoas=eoas,
+                chain_id=chain_id,
+                token_addresses=catalog.balance_tokens(chain_id),
+                rpc=rpc,
+                session=self._http.session,
+                api_key=self._config.alchemy_api_key,
+            )
+            return {(chain_id, eoa): balances.get(eoa, {}) for eoa in eoas}
+
+        balances: Dict[str, Dict[str, str]] = {}
+        # Lowercased EOA -> the spellings callers used, so mixed-case duplicates share one read.
+        missing: Dict[str, List[str]] = {}
+        for eoa in addresses:
+            lowered = eoa.lower()
+            cached = self._balance_cache.get((chain_id, lowered))
+            if cached is not None:
+                balances[eoa] = cached
+            else:
+                missing.setdefault(lowered, []).append(eoa)
+        if not missing:
+            return ChainBalances(balances)
+
+        try:
+            fetched = await self._flights.do_many([(chain_id, lowered) for lowered in missing], fetch)
+        except BALANCE_UNAVAILABLE_ERRORS as exc:
+            return self._stale_balances(chain_id, balances, missing, exc)
+        ttl = ttl if ttl is not None else self._balance_bucket_ttl()
+        for lowered, eoas in missing.items():
+            value = fetched.get((chain_id, lowered), {})
+            for eoa in eoas:
+                balances[eoa] = value
+            if (chain_id, lowered) in fetched:
+                self._balance_cache.set((chain_id, lowered), value, ttl=ttl)
+        return ChainBalances(balances)
+
+    def _stale_balances(
+        self,
+        chain_id: int,
+        balances: Dict[str, Dict[str, str]],
+        missing: Dict[str, List[str]],
+        exc: Exception,
+    ) -> ChainBalances:
+        max_stale = self._config.balance_stale_max_seconds
+        for lowered, eoas in missing.items():
+            stale = self._balance_cache.get_stale((chain_id, lowered), max_stale=max_stale)
+            if stale is None:
+                raise exc
+            for eoa in eoas:
+                balances[eoa] = stale
+        logger.info("Serving last known balances on chain %s: %s", chain_id, exc)
+        return ChainBalances(balances, stale=set(missing))
+
+    def _balance_bucket_ttl(self) -> float:
+        bucket = self._config.balance_cache_ttl_seconds
+        now = time.time()
+        return max(1.0, (now // bucket + 1) * bucket - now)
+
+    def invalidate_balances(self, addresses: Iterable[str]) -> int:
+        lowered = {address.lower() for address in addresses}
+        return self._balance_cache.invalidate(lambda key: key[1] in lowered)
+
+    def on_addresses_changed(self, _platform: str, _user_id: str, addresses: List[str]) -> None:
+        self.invalidate_balances(addresses)
+        self.invalidate_reports(addresses)
+
+    def invalidate_reports(self, addresses: Optional[Iterable[str]] = None) -> int:
+        if addresses is None:
+            count = len(self._report_cache)
+            self._report_cache.clear()
+            return count
+        lowered = {address.lower() for address in addresses}
+        return self._report_cache.invalidate(lambda key: not lowered.isdisjoint(key[0]))
+
+    def report_cache_stats(self) -> Dict[str, int]:
+        return self._report_cache.stats()
+
+    def balance_cache_stats(self) -> Dict[str, int]:
+        return self._balance_cache.stats()
+
+    def _generate_suggestions(self, user_vaults_details: list, catalog: VaultCatalog) -> List[SuggestionEntry]:
+        if not user_vaults_details or not catalog:
             return []
 
         user_holdings_lookup: Dict[Tuple[int, str], List[Decimal]] = {}
@@ -448,95 +670,90 @@ class ReportService:
         if not user_holdings_lookup:
             return []
 
-        suggestions: List[SuggestionEntry] = []
+        held = {(uv["chainID"], uv["address"]) for uv in user_vaults_details}
+        candidates: List[Tuple[VaultRecord, SuggestionEntry]] = []
         suggested_set = set()
 
-        for vault in all_vaults:
-            try:
-                chain_id = vault.get("chainID")
-                vault_address = vault.get("address", "").lower()
-                underlying_address = vault.get("token", {}).get("address", "").lower()
-                if not chain_id or not vault_address or not underlying_address:
+        for key, user_aprs in user_holdings_lookup.items():
+            for record in catalog.by_underlying.get(key, []):
+                try:
+                    if record.key in held or record.key in suggested_set:
+                        continue
+                    if record.tvl_usd < self._config.min_suggestion_tvl_usd:
+                        continue
+
+                    base_apr = record.net_apr_percent
+                    apr_difference = base_apr - min(user_aprs)
+                    if apr_difference <= self._config.suggestion_apr_threshold:
+                        continue
+
+                    candidates.append(
+                        (
+                            record,
+                            SuggestionEntry(
+                                chain_id=record.chain_id,
+                                chain_name=CHAIN_NAMES.get(record.chain_id, f"Chain {record.chain_id}"),
+                                display_name=record.display_name,
+                                token_symbol=record.token_symbol,
+                                vault_url=record.vault_url,
+                                base_apr=base_apr,
+                                apr_difference=apr_difference,
+                                tvl=record.tvl_usd,
+                            ),
+                        )
+                    )
+                    suggested_set.add(record.key)
+                except Exception as exc:
+                    logger.error("Suggestion processing failed: %s", exc)
                     continue
 
-                key = (chain_id, underlying_address)
-                user_aprs = user_holdings_lookup.get(key)
-                if not user_aprs:
-                    continue
+        candidates.sort(key=lambda c: (c[1].chain_id, -c[1].base_apr, c[0].order))
+        return [suggestion for _record, suggestion in candidates]
 
-                is_already_held = any(
-                    uv["address"] == vault_address and uv["chainID"] == chain_id for uv in user_vaults_details
-                )
-                if is_already_held:
-                    continue
 
-                tvl_usd = Decimal(vault.get("tvl", {}).get("tvl") or "0")
-                if tvl_usd < self._config.min_suggestion_tvl_usd:
-                    continue
+def _consume_task_exception(task: asyncio.Future) -> None:
+    if not task.cancelled():
+        task.exception()
 
-                net_apr = vault.get("apr", {}).get("netAPR")
-                base_apr = Decimal(net_apr or "0") * Decimal("100")
-                apr_difference = base_apr - min(user_aprs)
-                if apr_difference <= self._config.suggestion_apr_threshold:
-                    continue
 
-                suggestion_key = (chain_id, vault_address)
-                if suggestion_key in suggested_set:
+def collect_holdings(
+    catalog: VaultCatalog,
+    balances_by_chain: Dict[int, Dict[str, Dict[str, str]]],
+    addresses: List[str],
+) -> Dict[VaultRecord, List[int]]:
+    holdings: Dict[VaultRecord, List[int]] = {}
+    for chain_id, balances_by_eoa in balances_by_chain.items():
+        for eoa in addresses:
+            for token_lower, balance_hex in balances_by_eoa.get(eoa, {}).items():
+                try:
+                    value = int(balance_hex, 16)
+                except (TypeError, ValueError):
                     continue
-
-                suggestions.append(
-                    SuggestionEntry(
-                        chain_id=chain_id,
-                        chain_name=CHAIN_NAMES.get(chain_id, f"Chain {chain_id}"),
-                        display_name=vault.get("display_name") or vault.get("name", "Vault"),
-                        token_symbol=vault.get("token", {}).get("display_name") or vault.get("token", {}).get("symbol") or "Asset",
-                        vault_url=f"https://yearn.fi/v3/{chain_id}/{vault.get('address')}",
-                        base_apr=base_apr,
-                        apr_difference=apr_difference,
-                        tvl=tvl_usd,
-                    )
-                )
-                suggested_set.add(suggestion_key)
-            except Exception as exc:
-                logger.error("Suggestion processing failed: %s", exc)
-                continue
-
-        suggestions.sort(key=lambda s: (s.chain_id, -s.base_apr))
-        return suggestions
-
-
-def process_timeseries_data_with_decimal(timeseries: list) -> Tuple[Decimal, Decimal, Decimal]:
-    if not timeseries:
-        return Decimal("0"), Decimal("0"), Decimal("0")
-    try:
-        sorted_timeseries = sorted(timeseries, key=lambda x: int(x["time"]))
-        now = datetime.utcnow()
-        ts_7d = int((now - timedelta(days=7)).timestamp())
-        ts_30d = int((now - timedelta(days=30)).timestamp())
-
-        def find_closest(target_ts: int) -> dict:
-            entries = [entry for entry in sorted_timeseries if int(entry["time"]) <= target_ts]
-            if not entries:
-                return sorted_timeseries[0]
-            return entries[-1]
-
-        current = sorted_timeseries[-1]
-        entry_7d = find_closest(ts_7d)
-        entry_30d = find_closest(ts_30d)
-
-        return Decimal(current["value"]), Decimal(entry_7d["value"]), Decimal(entry_30d["value"])
-    except (KeyError, ValueError, TypeError, InvalidOperation) as exc:
-        logger.error("Timeseries processing error: %s", exc)
-        return Decimal("0"), Decimal("0"), Decimal("0")
+                if value <= 0:
+                    continue
+                slot = 0
+                record = catalog.by_key.get((chain_id, token_lower))
+                if record is None:
+                    slot = 1
+                    record = catalog.by_yearn_gauge.get((chain_id, token_lower))
+                if record is None and chain_id == 1:
+                    slot = 2
+                    record = catalog.by_one_up_gauge.get(token_lower)
+                if record is None:
+                    continue
+                holdings.setdefault(record, [0, 0, 0])[slot] += value
+    return holdings
 
 
-def calculate_yield_with_decimal(current: Decimal, historical: Decimal) -> Decimal:
-    if historical == Decimal("0"):
+def one_up_staking_apr(one_up_data: Optional[dict], gauge_address_lower: Optional[str]) -> Decimal:
+    if not one_up_data or not gauge_address_lower:
+        return Decimal("0")
+    gauge_data = one_up_data.get("gauges", {}).get(gauge_address_lower)
+    if not gauge_data or gauge_data.get("reward_apr") is None:
         return Decimal("0")
     try:
-        return ((Decimal(current) / Decimal(historical)) - Decimal("1")) * Decimal("100")
-    except (InvalidOperation, TypeError) as exc:
-        logger.error("Yield calculation error: %s", exc)
+        return Decimal(gauge_data["reward_apr"])
+    except Exception:
         return Decimal("0")
 
 
@@ -0,0 +1,141 @@
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_ON_DEMAND = 0
+PRIORITY_DAILY = 1
+
+
+class QueueFullError(Exception):
+    pass
+
+
+@dataclass
+class _Job:
+    platform: str
+    factory: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+
+
+@dataclass
+class QueuedReport:
+    position: int
+    future: asyncio.Future
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class ReportQueue:
+    def __init__(self, workers: int = 4, max_depth: int = 100) -> None:
+        self._workers = max(1, workers)
+        self._max_depth = max(1, max_depth)
+        # priority -> platform -> jobs; platforms are served round-robin within a priority.
+        self._lanes: Dict[int, Dict[str, Deque[_Job]]] = {PRIORITY_ON_DEMAND: {}, PRIORITY_DAILY: {}}
+        self._turns: Dict[int, Deque[str]] = {PRIORITY_ON_DEMAND: deque(), PRIORITY_DAILY: deque()}
+        self._ready = asyncio.Semaphore(0)
+        self._running = 0
+
+    def depth(self, priority: int = PRIORITY_ON_DEMAND) -> int:
+        return sum(len(jobs) for jobs in self._lanes[priority].values())
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def submit(
+        self,
+        platform: str,
+        factory: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_ON_DEMAND,
+    ) -> QueuedReport:
+        # Only interactive requests are turned away; daily work is already paced by the scheduler.
+        if priority == PRIORITY_ON_DEMAND and self.depth(priority) >= self._max_depth:
+            raise QueueFullError(f"Report queue is full ({self._max_depth} waiting)")
+        job = _Job(platform, factory, asyncio.get_running_loop().create_future())
+        lanes = self._lanes[priority]
+        if platform not in lanes:
+            lanes[platform] = deque()
+            self._turns[priority].append(platform)
+        lanes[platform].append(job)
+        self._ready.release()
+        job.future.add_done_callback(_consume_exception)
+        # Jobs that have to start before this one; 0 means a worker is free.
+        waiting = self.depth(PRIORITY_ON_DEMAND)
+        if priority == PRIORITY_DAILY:
+            waiting += self.depth(PRIORITY_DAILY)
+        return QueuedReport(position=max(0, self._running + waiting - self._workers), future=job.future)
+
+    async def run_job(
+        self,
+        platform: str,
+        factory: Callable[[], Awaitable[Any]],
+        priority: int = PRIORITY_ON_DEMAND,
+    ) -> Any:
+        return await self.submit(platform, factory, priority).future
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        workers = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        try:
+            await stop_event.wait()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            for job in self._drain():
+                if not job.future.done():
+                    job.future.cancel()
+
+    def _next_job(self) -> Optional[_Job]:
+        for priority in (PRIORITY_ON_DEMAND, PRIORITY_DAILY):
+            lanes = self._lanes[priority]
+            turns = self._turns[priority]
+            while turns:
+                platform = turns.popleft()
+                jobs = lanes[platform]
+                job = jobs.popleft()
+                if jobs:
+                    turns.append(platform)
+                else:
+                    del lanes[platform]
+                if job.future.cancelled():
+                    continue
+                return job
+        return None
+
+    def _drain(self) -> List[_Job]:
+        jobs = []
+        for priority, lanes in self._lanes.items():
+            for platform_jobs in lanes.values():
+                jobs.extend(platform_jobs)
+            lanes.clear()
+            self._turns[priority].clear()
+        return jobs
+
+    async def _worker(self) -> None:
+        while True:
+            await self._ready.acquire()
+            job = self._next_job()
+            if job is None:
+                continue
+            self._running += 1
+            try:
+                result = await job.factory()
+            except asyncio.CancelledError:
+                if not job.future.done():
+                    job.future.cancel()
+                raise
+            except Exception as exc:
+                if not job.future.done():
+                    job.future.set_exception(exc)
+            else:
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._running -= 1
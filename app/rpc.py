@@ -0,0 +1,185 @@
+import asyncio
+import itertools
+import logging
+import time
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, TypeVar
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .circuit import CircuitBreaker, CircuitOpenError, circuit_breaker
+from .http import SharedHttpClient
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+EWMA_ALPHA = 0.3
+FAILURES_BEFORE_UNHEALTHY = 2
+# Endpoints this many blocks behind the best one are treated as unhealthy.
+MAX_BLOCK_LAG = 20
+# A single pool call, including every failover attempt, is bounded by this many request timeouts.
+CALL_BUDGET_TIMEOUTS = 2
+
+
+class RpcError(Exception):
+    pass
+
+
+class RpcCallError(RpcError):
+    pass
+
+
+class AsyncRpcClient:
+    def __init__(self, http_client: SharedHttpClient, url: str, chain_id: int, timeout: float = 15) -> None:
+        self._http = http_client
+        self._url = url
+        self._chain_id = chain_id
+        self._timeout = timeout
+        self._ids = itertools.count(1)
+
+    @property
+    def chain_id(self) -> int:
+        return self._chain_id
+
+    async def _post(self, payload: Any) -> Any:
+        session = self._http.session
+        async with session.post(self._url, json=payload, timeout=self._timeout) as response:
+            if response.status != 200:
+                raise RpcError(f"HTTP {response.status} from chain {self._chain_id} RPC")
+            return await response.json(content_type=None)
+
+    def _unwrap(self, data: Any) -> Any:
+        if not isinstance(data, dict):
+            raise RpcError(f"Malformed RPC response on chain {self._chain_id}")
+        if data.get("error"):
+            raise RpcCallError(f"RPC error on chain {self._chain_id}: {data['error']}")
+        if "result" not in data:
+            raise RpcError(f"RPC response without result on chain {self._chain_id}")
+        return data["result"]
+
+    async def request(self, method: str, params: Optional[list] = None) -> Any:
+        payload = {"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": params or []}
+        return self._unwrap(await self._post(payload))
+
+    async def eth_call(self, to: str, data: bytes, block: str = "latest") -> bytes:
+        result = await self.request("eth_call", [{"to": to, "data": "0x" + data.hex()}, block])
+        return bytes.fromhex(result[2:] if result.startswith("0x") else result)
+
+    async def block_number(self) -> int:
+        return int(await self.request("eth_blockNumber"), 16)
+
+
+class RpcEndpoint:
+    def __init__(self, client: AsyncRpcClient, url: str) -> None:
+        self.client = client
+        # Provider URLs often embed API keys, so only the host is ever logged.
+        self.label = urlparse(url).hostname or "rpc"
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.block: Optional[int] = None
+        self.lagging = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.failures < FAILURES_BEFORE_UNHEALTHY and not self.lagging
+
+    def record_success(self, latency: float) -> None:
+        self.failures = 0
+        self.latency = latency if self.latency is None else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency
+
+    def record_failure(self) -> None:
+        self.failures += 1
+
+
+class RpcPool:
+    def __init__(self, http_client: SharedHttpClient, chain_id: int, urls: Sequence[str], timeout: float = 10) -> None:
+        self._chain_id = chain_id
+        self._endpoints = [RpcEndpoint(AsyncRpcClient(http_client, url, chain_id, timeout), url) for url in urls]
+        self._urls = list(urls)
+        self._timeout = timeout
+        self._breaker = circuit_breaker(f"rpc:{chain_id}")
+
+    @property
+    def chain_id(self) -> int:
+        return self._chain_id
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def endpoints(self) -> List[RpcEndpoint]:
+        return list(self._endpoints)
+
+    def best_url(self) -> Optional[str]:
+        ranked = self._ranked()
+        if not ranked:
+            return None
+        return self._urls[self._endpoints.index(ranked[0])]
+
+    def _ranked(self) -> List[RpcEndpoint]:
+        # Unprobed endpoints keep their configured order; unhealthy ones sort last.
+        return sorted(
+            self._endpoints,
+            key=lambda endpoint: (not endpoint.healthy, endpoint.latency if endpoint.latency is not None else float("inf")),
+        )
+
+    async def _call(self, op: Callable[[AsyncRpcClient], Awaitable[T]]) -> T:
+        if not self._breaker.allow():
+            raise CircuitOpenError(f"RPC circuit open on chain {self._chain_id}")
+        ranked = self._ranked()
+        # Unhealthy endpoints are only tried when nothing healthy is left; check_health brings them back.
+        candidates = [endpoint for endpoint in ranked if endpoint.healthy] or ranked
+        deadline = time.monotonic() + self._timeout * CALL_BUDGET_TIMEOUTS
+        last_exc: Optional[BaseException] = None
+        for endpoint in candidates:
+            started = time.monotonic()
+            remaining = deadline - started
+            if remaining <= 0:
+                last_exc = last_exc or asyncio.TimeoutError()
+                break
+            try:
+                result = await asyncio.wait_for(op(endpoint.client), timeout=min(self._timeout, remaining))
+            except RpcCallError:
+                endpoint.record_success(time.monotonic() - started)
+                self._breaker.record_success()
+                raise
+            except (RpcError, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+                endpoint.record_failure()
+                last_exc = exc
+                logger.warning("RPC %s failed on chain %s (%r); failing over", endpoint.label, self._chain_id, exc)
+                continue
+            endpoint.record_success(time.monotonic() - started)
+            self._breaker.record_success()
+            return result
+        self._breaker.record_failure()
+        raise RpcError(f"All RPC endpoints failed on chain {self._chain_id}: {last_exc}")
+
+    async def request(self, method: str, params: Optional[list] = None) -> Any:
+        return await self._call(lambda client: client.request(method, params))
+
+    async def eth_call(self, to: str, data: bytes, block: str = "latest") -> bytes:
+        return await self._call(lambda client: client.eth_call(to, data, block))
+
+    async def block_number(self) -> int:
+        return await self._call(lambda client: client.block_number())
+
+    async def check_health(self) -> None:
+        async def probe(endpoint: RpcEndpoint) -> None:
+            started = time.monotonic()
+            try:
+                endpoint.block = await asyncio.wait_for(endpoint.client.block_number(), timeout=self._timeout)
+            except Exception as exc:
+                endpoint.block = None
+                # A failed probe takes the endpoint out of rotation until the next successful one.
+                endpoint.failures = max(endpoint.failures + 1, FAILURES_BEFORE_UNHEALTHY)
+                logger.warning("RPC %s unhealthy on chain %s: %r", endpoint.label, self._chain_id, exc)
+                return
+            endpoint.record_success(time.monotonic() - started)
+
+        await asyncio.gather(*[probe(endpoint) for endpoint in self._endpoints])
+        blocks = [endpoint.block for endpoint in self._endpoints if endpoint.block is not None]
+        head = max(blocks) if blocks else None
+        for endpoint in self._endpoints:
+            endpoint.lagging = head is not None and endpoint.block is not None and head - endpoint.block > MAX_BLOCK_LAG
@@ -0,0 +1,180 @@
+import asyncio
+import hashlib
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Awaitable, Callable, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK_SECONDS = 30
+DEFAULT_BATCH_SIZE = 50
+# Subscribers are reloaded this often even without a settings change, to pick up writes from elsewhere.
+DEFAULT_RELOAD_SECONDS = 15 * 60
+
+
+def parse_daily_time(value: Optional[str]) -> Optional[time]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.strptime(value.strip(), "%H:%M")
+    except ValueError:
+        return None
+    return time(hour=parsed.hour, minute=parsed.minute)
+
+
+def stable_offset_seconds(platform: str, user_id: str, window_minutes: int) -> int:
+    window_seconds = max(0, window_minutes) * 60
+    if window_seconds == 0:
+        return 0
+    digest = hashlib.sha256(f"{platform}:{user_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") % window_seconds
+
+
+def daily_slot(
+    platform: str,
+    user_id: str,
+    day: date,
+    base_time: time,
+    window_minutes: int,
+    preferred: Optional[time] = None,
+) -> datetime:
+    if preferred is not None:
+        return datetime.combine(day, preferred.replace(tzinfo=None), tzinfo=timezone.utc)
+    start = datetime.combine(day, base_time.replace(tzinfo=None), tzinfo=timezone.utc)
+    return start + timedelta(seconds=stable_offset_seconds(platform, user_id, window_minutes))
+
+
+def daily_run_id(day: date) -> str:
+    return f"daily:{day.isoformat()}"
+
+
+class DailyScheduler:
+    def __init__(
+        self,
+        platform: str,
+        base_time: time,
+        window_minutes: int,
+        load_users: Callable[[], Awaitable[List[dict]]],
+        dispatch: Callable[[str, List[str]], Awaitable[None]],
+        workers: int = 2,
+        tick_seconds: int = DEFAULT_TICK_SECONDS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        prewarm: Optional[Callable[[List[str]], Awaitable[None]]] = None,
+        prewarm_minutes: int = 0,
+        users_version: Optional[Callable[[], int]] = None,
+        reload_seconds: int = DEFAULT_RELOAD_SECONDS,
+    ) -> None:
+        self._platform = platform
+        self._base_time = base_time
+        self._window_minutes = max(0, window_minutes)
+        self._load_users = load_users
+        self._dispatch = dispatch
+        self._workers = max(1, workers)
+        self._tick_seconds = max(1, tick_seconds)
+        self._batch_size = max(1, batch_size)
+        self._prewarm = prewarm
+        self._prewarm_lead = timedelta(minutes=max(0, prewarm_minutes)) if prewarm else timedelta(0)
+        self._queue: "asyncio.Queue[Tuple[str, str, List[str]]]" = asyncio.Queue()
+        self._dispatched: Set[Tuple[str, str]] = set()
+        self._prewarmed: Set[Tuple[str, str]] = set()
+        self._users_version = users_version
+        self._reload_seconds = max(1, reload_seconds)
+        self._users: Optional[List[dict]] = None
+        self._users_loaded_at = 0.0
+        self._loaded_version: Optional[int] = None
+
+    def slot_for(self, user_id: str, day: date, preferred: Optional[time] = None) -> datetime:
+        return daily_slot(self._platform, user_id, day, self._base_time, self._window_minutes, preferred)
+
+    def due_users(
+        self,
+        users: Iterable[dict],
+        since: datetime,
+        now: datetime,
+        lead: timedelta = timedelta(0),
+        seen: Optional[Set[Tuple[str, str]]] = None,
+    ) -> List[Tuple[str, str]]:
+        seen = self._dispatched if seen is None else seen
+        due = []
+        for row in users:
+            user_id = row["user_id"]
+            preferred = parse_daily_time(row.get("daily_report_time"))
+            # A window that starts late in the day can spill past midnight.
+            for day in (now.date() - timedelta(days=1), now.date(), now.date() + timedelta(days=1)):
+                slot = self.slot_for(user_id, day, preferred) - lead
+                run_id = daily_run_id(day)
+                if since < slot <= now and (run_id, user_id) not in seen:
+                    due.append((run_id, user_id))
+        return due
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        workers = [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        # Catch up on slots missed by a restart inside the window; the outbox skips users already handled.
+        since = datetime.now(timezone.utc) - timedelta(minutes=max(self._window_minutes, 1))
+        try:
+            while not stop_event.is_set():
+                now = datetime.now(timezone.utc)
+                try:
+                    await self._tick(since, now)
+                    since = now
+                except Exception as exc:
+                    logger.error("Daily scheduler tick failed: %s", exc)
+                try:
+                    await asyncio.wait_for(stop_event.wait(), timeout=self._tick_seconds)
+                except asyncio.TimeoutError:
+                    continue
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _current_users(self) -> List[dict]:
+        version = self._users_version() if self._users_version else None
+        loop_time = asyncio.get_running_loop().time()
+        if (
+            self._users is None
+            or version != self._loaded_version
+            or loop_time - self._users_loaded_at >= self._reload_seconds
+        ):
+            self._users = await self._load_users()
+            self._users_loaded_at = loop_time
+            self._loaded_version = version
+        return self._users
+
+    async def _tick(self, since: datetime, now: datetime) -> None:
+        users = await self._current_users()
+        if self._prewarm:
+            warm = self.due_users(users, since, now, self._prewarm_lead, self._prewarmed)
+            self._enqueue("prewarm", warm, self._prewarmed)
+        due = self.due_users(users, since, now)
+        self._enqueue("dispatch", due, self._dispatched)
+        if due:
+            logger.info("Scheduled %d daily report(s) for %s", len(due), self._platform)
+        self._forget_old_runs(now.date())
+
+    def _enqueue(self, kind: str, due: List[Tuple[str, str]], seen: Set[Tuple[str, str]]) -> None:
+        by_run: dict[str, List[str]] = {}
+        for run_id, user_id in due:
+            seen.add((run_id, user_id))
+            by_run.setdefault(run_id, []).append(user_id)
+        for run_id, user_ids in by_run.items():
+            for start in range(0, len(user_ids), self._batch_size):
+                self._queue.put_nowait((kind, run_id, user_ids[start : start + self._batch_size]))
+
+    def _forget_old_runs(self, today: date) -> None:
+        keep = {daily_run_id(today + timedelta(days=delta)) for delta in (-1, 0, 1)}
+        self._dispatched = {entry for entry in self._dispatched if entry[0] in keep}
+        self._prewarmed = {entry for entry in self._prewarmed if entry[0] in keep}
+
+    async def _worker(self) -> None:
+        while True:
+            kind, run_id, user_ids = await self._queue.get()
+            try:
+                if kind == "prewarm":
+                    await self._prewarm(user_ids)
+                else:
+                    await self._dispatch(run_id, user_ids)
+            except Exception as exc:
+                logger.error("Daily %s for %s failed: %s", kind, run_id, exc)
+            finally:
+                self._queue.task_done()
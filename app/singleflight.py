@@ -0,0 +1,72 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, Iterable, List, Mapping, TypeVar
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        return key in self._inflight
+
+    def _register(self, key: Hashable, future: asyncio.Future) -> None:
+        self._inflight[key] = future
+
+        def _done(fut: asyncio.Future) -> None:
+            _consume_exception(fut)
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+        future.add_done_callback(_done)
+
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._register(key, future)
+        return await asyncio.shield(future)
+
+    async def do_many(
+        self,
+        keys: Iterable[K],
+        factory: Callable[[List[K]], Awaitable[Mapping[K, T]]],
+    ) -> Dict[K, T]:
+        waiting: Dict[K, asyncio.Future] = {}
+        missing: List[K] = []
+        for key in dict.fromkeys(keys):
+            future = self._inflight.get(key)
+            if future is not None:
+                waiting[key] = future
+            else:
+                missing.append(key)
+
+        if missing:
+            batch = asyncio.ensure_future(factory(list(missing)))
+            batch.add_done_callback(_consume_exception)
+
+            async def pick(key: K) -> T:
+                return (await batch).get(key)
+
+            for key in missing:
+                future = asyncio.ensure_future(pick(key))
+                self._register(key, future)
+                waiting[key] = future
+
+        results: Dict[K, T] = {}
+        if not waiting:
+            return results
+        outcomes = await asyncio.gather(*[asyncio.shield(f) for f in waiting.values()], return_exceptions=True)
+        for key, outcome in zip(waiting.keys(), outcomes):
+            if isinstance(outcome, BaseException):
+                raise outcome
+            if outcome is not None:
+                results[key] = outcome
+        return results
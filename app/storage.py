@@ -1,8 +1,18 @@
 import asyncio
+import json
 import os
 import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Iterable, Optional, Dict, List
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, Dict, List, Tuple
+
+from .ttl_cache import TTLCache
+
+CACHED_STATEMENTS = 256
+BUSY_TIMEOUT_MS = 5000
+DAILY_SUBSCRIBER_PAGE_SIZE = 500
 
 
 SCHEMA = [
@@ -40,41 +50,179 @@ SCHEMA = [
         daily_reports INTEGER NOT NULL DEFAULT 0
     )
     """,
+    """
+    CREATE TABLE IF NOT EXISTS usage_metrics (
+        date TEXT NOT NULL,
+        platform TEXT NOT NULL,
+        kind TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (date, platform, kind, metric)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS outbox (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        platform TEXT NOT NULL,
+        user_id TEXT NOT NULL,
+        run_id TEXT NOT NULL,
+        seq INTEGER NOT NULL,
+        text TEXT NOT NULL,
+        entities_json TEXT,
+        with_keyboard INTEGER NOT NULL DEFAULT 0,
+        status TEXT NOT NULL DEFAULT 'pending',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL DEFAULT 0,
+        last_error TEXT,
+        created_at TEXT NOT NULL,
+        sent_at TEXT,
+        UNIQUE (platform, user_id, run_id, seq)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS outbox_due ON outbox (platform, status, next_attempt_at)
+    """,
+]
+
+
+def _add_column(cursor: sqlite3.Cursor, table: str, column: str, definition: str) -> None:
+    columns = {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+
+def _execute_all(*statements: str) -> Callable[[sqlite3.Cursor], None]:
+    def apply(cursor: sqlite3.Cursor) -> None:
+        for stmt in statements:
+            cursor.execute(stmt)
+
+    return apply
+
+
+# Applied in order on top of SCHEMA; PRAGMA user_version records how many have run.
+MIGRATIONS: List[Callable[[sqlite3.Cursor], None]] = [
+    lambda cursor: _add_column(cursor, "user_settings", "daily_report_time", "TEXT"),
+    _execute_all(
+        "CREATE INDEX IF NOT EXISTS user_settings_daily ON user_settings (platform, daily_reports_enabled, user_id)",
+        "CREATE INDEX IF NOT EXISTS addresses_by_user ON addresses (platform, user_id, added_at)",
+        "CREATE INDEX IF NOT EXISTS outbox_by_run ON outbox (platform, run_id, user_id)",
+    ),
 ]
 
+
+def _group_subscribers(rows: Iterable[sqlite3.Row]) -> Dict[str, dict]:
+    subscribers: Dict[str, dict] = {}
+    for row in rows:
+        subscriber = subscribers.get(row["user_id"])
+        if subscriber is None:
+            subscriber = subscribers[row["user_id"]] = {
+                "user_id": row["user_id"],
+                "daily_report_time": row["daily_report_time"],
+                "addresses": [],
+            }
+        if row["address"] is not None:
+            subscriber["addresses"].append({"address": row["address"], "ens_name": row["ens_name"]})
+    return subscribers
+
+
+@dataclass
+class _Reader:
+    conn: sqlite3.Connection
+    executor: ThreadPoolExecutor
+
+
 class SQLiteStore:
-    def __init__(self, path: str) -> None:
+    def __init__(self, path: str, readers: int = 4, cache_entries: int = 50000) -> None:
         self._path = path
         if os.path.isdir(self._path):
             raise ValueError(f"DB path points to a directory: {self._path}")
         parent = os.path.dirname(self._path)
         if parent:
             os.makedirs(parent, exist_ok=True)
-        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        # All writes go through one connection on one thread, so they are serialized without a lock.
+        self._conn = sqlite3.connect(self._path, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
         self._conn.row_factory = sqlite3.Row
-        self._lock = asyncio.Lock()
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._reader_count = max(1, readers)
+        self._readers: "asyncio.Queue[_Reader]" = asyncio.Queue()
+        self._all_readers: List[_Reader] = []
+        self._address_listeners: List[Callable[[str, str, List[str]], None]] = []
+        # Write-through caches for per-user rows; every write to them goes through this store.
+        self._addresses_cache: TTLCache[Tuple[str, str], Tuple[dict, ...]] = TTLCache(cache_entries)
+        self._settings_cache: TTLCache[Tuple[str, str], dict] = TTLCache(cache_entries)
+        self._write_seq = 0
+        self._daily_settings_version = 0
+
+    @property
+    def daily_settings_version(self) -> int:
+        return self._daily_settings_version
 
     async def close(self) -> None:
-        await asyncio.to_thread(self._conn.close)
+        for reader in self._all_readers:
+            await asyncio.get_running_loop().run_in_executor(reader.executor, reader.conn.close)
+            reader.executor.shutdown(wait=False)
+        self._all_readers.clear()
+        await self._write(self._conn.close)
+        self._write_executor.shutdown(wait=False)
 
     async def init(self) -> None:
-        async with self._lock:
-            await asyncio.to_thread(self._init_sync)
+        await self._write(self._init_sync)
+        for index in range(self._reader_count):
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sqlite-reader-{index}")
+            conn = await asyncio.get_running_loop().run_in_executor(executor, self._open_reader)
+            reader = _Reader(conn, executor)
+            self._all_readers.append(reader)
+            self._readers.put_nowait(reader)
+
+    def _open_reader(self) -> sqlite3.Connection:
+        uri = f"file:{os.path.abspath(self._path)}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False, cached_statements=CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return conn
+
+    async def _write(self, fn: Callable[..., Any], *args) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self._write_executor, fn, *args)
+
+    async def _read(self, fn: Callable[..., Any], *args) -> Any:
+        reader = await self._readers.get()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(reader.executor, fn, reader.conn, *args)
+        finally:
+            self._readers.put_nowait(reader)
 
     def _init_sync(self) -> None:
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.execute("PRAGMA synchronous = NORMAL")
+        self._conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
         cursor = self._conn.cursor()
         for stmt in SCHEMA:
             cursor.execute(stmt)
         self._conn.commit()
+        version = cursor.execute("PRAGMA user_version").fetchone()[0]
+        for index, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+            migration(cursor)
+            cursor.execute(f"PRAGMA user_version = {index}")
+            self._conn.commit()
 
 
+    def on_addresses_changed(self, callback: Callable[[str, str, List[str]], None]) -> None:
+        self._address_listeners.append(callback)
+
     async def get_addresses(self, platform: str, user_id: str) -> List[dict]:
-        async with self._lock:
-            rows = await asyncio.to_thread(self._get_addresses_sync, platform, user_id)
-        return [dict(row) for row in rows]
+        key = (platform, user_id)
+        cached = self._addresses_cache.get(key)
+        if cached is None:
+            seq = self._write_seq
+            rows = await self._read(self._get_addresses_sync, platform, user_id)
+            cached = tuple(dict(row) for row in rows)
+            # A write that landed while we were reading already refreshed the entry.
+            if seq == self._write_seq:
+                self._addresses_cache.set(key, cached)
+        return [dict(row) for row in cached]
 
-    def _get_addresses_sync(self, platform: str, user_id: str) -> List[sqlite3.Row]:
-        cursor = self._conn.cursor()
+    def _get_addresses_sync(self, conn: sqlite3.Connection, platform: str, user_id: str) -> List[sqlite3.Row]:
+        cursor = conn.cursor()
         cursor.execute(
             "SELECT address, ens_name FROM addresses WHERE platform = ? AND user_id = ? ORDER BY added_at",
             (platform, user_id),
@@ -84,8 +232,17 @@ class SQLiteStore:
     async def set_addresses(self, platform: str, user_id: str, addresses: Iterable[str], ens_map: Optional[Dict[str, str]] = None) -> None:
         ens_map = ens_map or {}
         timestamp = datetime.utcnow().isoformat()
-        async with self._lock:
-            await asyncio.to_thread(self._set_addresses_sync, platform, user_id, list(addresses), ens_map, timestamp)
+        addresses = list(addresses)
+        self._write_seq += 1
+        try:
+            await self._write(self._set_addresses_sync, platform, user_id, addresses, ens_map, timestamp)
+        except BaseException:
+            self._addresses_cache.pop((platform, user_id))
+            raise
+        rows = {address: {"address": address, "ens_name": ens_map.get(address)} for address in addresses}
+        self._addresses_cache.set((platform, user_id), tuple(rows.values()))
+        for callback in self._address_listeners:
+            callback(platform, user_id, addresses)
 
     def _set_addresses_sync(self, platform: str, user_id: str, addresses: List[str], ens_map: Dict[str, str], timestamp: str) -> None:
         cursor = self._conn.cursor()
@@ -109,77 +266,173 @@ class SQLiteStore:
         self._conn.commit()
 
     async def set_daily_reports(self, platform: str, user_id: str, enabled: bool) -> None:
-        async with self._lock:
-            await asyncio.to_thread(self._set_daily_reports_sync, platform, user_id, enabled)
+        await self._write_setting(platform, user_id, "daily_reports_enabled", enabled, self._set_daily_reports_sync)
 
     def _set_daily_reports_sync(self, platform: str, user_id: str, enabled: bool) -> None:
         cursor = self._conn.cursor()
         cursor.execute(
-            "INSERT OR REPLACE INTO user_settings (platform, user_id, daily_reports_enabled) VALUES (?, ?, ?)",
+            "INSERT INTO user_settings (platform, user_id, daily_reports_enabled) VALUES (?, ?, ?) "
+            "ON CONFLICT (platform, user_id) DO UPDATE SET daily_reports_enabled = excluded.daily_reports_enabled",
             (platform, user_id, 1 if enabled else 0),
         )
         self._conn.commit()
 
-    async def get_daily_users(self, platform: str) -> List[dict]:
-        async with self._lock:
-            rows = await asyncio.to_thread(self._get_daily_users_sync, platform)
-        return [dict(row) for row in rows]
+    async def set_daily_report_time(self, platform: str, user_id: str, value: Optional[str]) -> None:
+        await self._write_setting(platform, user_id, "daily_report_time", value, self._set_daily_report_time_sync)
 
-    def _get_daily_users_sync(self, platform: str) -> List[sqlite3.Row]:
-        cursor = self._conn.cursor()
-        cursor.execute(
-            "SELECT user_id FROM user_settings WHERE platform = ? AND daily_reports_enabled = 1",
-            (platform,),
-        )
-        return cursor.fetchall()
+    async def _write_setting(self, platform: str, user_id: str, name: str, value: Any, write_sync: Callable[..., None]) -> None:
+        key = (platform, user_id)
+        self._write_seq += 1
+        try:
+            await self._write(write_sync, platform, user_id, value)
+        except BaseException:
+            self._settings_cache.pop(key)
+            raise
+        cached = self._settings_cache.peek(key)
+        if cached is not None:
+            self._settings_cache.set(key, {**cached, name: value})
+        self._daily_settings_version += 1
 
-    async def get_daily_reports_enabled(self, platform: str, user_id: str) -> bool:
-        async with self._lock:
-            return await asyncio.to_thread(self._get_daily_reports_enabled_sync, platform, user_id)
+    async def _get_settings(self, platform: str, user_id: str) -> dict:
+        key = (platform, user_id)
+        cached = self._settings_cache.get(key)
+        if cached is None:
+            seq = self._write_seq
+            cached = await self._read(self._get_settings_sync, platform, user_id)
+            if seq == self._write_seq:
+                self._settings_cache.set(key, cached)
+        return cached
 
-    def _get_daily_reports_enabled_sync(self, platform: str, user_id: str) -> bool:
-        cursor = self._conn.cursor()
+    def _get_settings_sync(self, conn: sqlite3.Connection, platform: str, user_id: str) -> dict:
+        cursor = conn.cursor()
         cursor.execute(
-            "SELECT daily_reports_enabled FROM user_settings WHERE platform = ? AND user_id = ?",
+            "SELECT daily_reports_enabled, daily_report_time FROM user_settings WHERE platform = ? AND user_id = ?",
             (platform, user_id),
         )
         row = cursor.fetchone()
         if row is None:
-            return False
-        return bool(row["daily_reports_enabled"])
-
-    async def increment_usage(self, on_demand: int = 0, daily: int = 0) -> None:
-        date_str = datetime.utcnow().date().isoformat()
-        async with self._lock:
-            await asyncio.to_thread(self._increment_usage_sync, date_str, on_demand, daily)
+            return {"daily_reports_enabled": False, "daily_report_time": None}
+        return {"daily_reports_enabled": bool(row["daily_reports_enabled"]), "daily_report_time": row["daily_report_time"]}
 
-    def _increment_usage_sync(self, date_str: str, on_demand: int, daily: int) -> None:
+    def _set_daily_report_time_sync(self, platform: str, user_id: str, value: Optional[str]) -> None:
         cursor = self._conn.cursor()
         cursor.execute(
-            "INSERT OR IGNORE INTO usage_counters (date, on_demand_reports, daily_reports) VALUES (?, 0, 0)",
-            (date_str,),
+            "INSERT INTO user_settings (platform, user_id, daily_report_time) VALUES (?, ?, ?) "
+            "ON CONFLICT (platform, user_id) DO UPDATE SET daily_report_time = excluded.daily_report_time",
+            (platform, user_id, value),
+        )
+        self._conn.commit()
+
+    async def get_daily_report_time(self, platform: str, user_id: str) -> Optional[str]:
+        return (await self._get_settings(platform, user_id))["daily_report_time"]
+
+    async def get_daily_users(self, platform: str) -> List[dict]:
+        rows = await self._read(self._get_daily_users_sync, platform)
+        return [dict(row) for row in rows]
+
+    async def iter_daily_subscribers(
+        self,
+        platform: str,
+        page_size: int = DAILY_SUBSCRIBER_PAGE_SIZE,
+    ) -> AsyncIterator[List[dict]]:
+        after = ""
+        while True:
+            rows = await self._read(self._daily_subscribers_page_sync, platform, after, page_size)
+            if not rows:
+                return
+            page = _group_subscribers(rows)
+            yield list(page.values())
+            if len(page) < page_size:
+                return
+            after = rows[-1]["user_id"]
+
+    def _daily_subscribers_page_sync(self, conn: sqlite3.Connection, platform: str, after: str, limit: int) -> List[sqlite3.Row]:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT s.user_id, s.daily_report_time, a.address, a.ens_name FROM ("
+            "  SELECT user_id, daily_report_time FROM user_settings"
+            "  WHERE platform = ? AND daily_reports_enabled = 1 AND user_id > ?"
+            "  ORDER BY user_id LIMIT ?"
+            ") AS s LEFT JOIN addresses AS a ON a.platform = ? AND a.user_id = s.user_id "
+            "ORDER BY s.user_id, a.added_at",
+            (platform, after, limit, platform),
         )
+        return cursor.fetchall()
+
+    async def get_daily_subscribers(self, platform: str, user_ids: Iterable[str]) -> Dict[str, dict]:
+        user_ids = list(dict.fromkeys(user_ids))
+        subscribers: Dict[str, dict] = {}
+        for start in range(0, len(user_ids), DAILY_SUBSCRIBER_PAGE_SIZE):
+            chunk = user_ids[start : start + DAILY_SUBSCRIBER_PAGE_SIZE]
+            rows = await self._read(self._daily_subscribers_by_id_sync, platform, chunk)
+            subscribers.update(_group_subscribers(rows))
+        return subscribers
+
+    def _daily_subscribers_by_id_sync(self, conn: sqlite3.Connection, platform: str, user_ids: List[str]) -> List[sqlite3.Row]:
+        cursor = conn.cursor()
+        placeholders = ", ".join("?" for _ in user_ids)
         cursor.execute(
-            "UPDATE usage_counters SET on_demand_reports = on_demand_reports + ?, daily_reports = daily_reports + ? WHERE date = ?",
-            (on_demand, daily, date_str),
+            "SELECT s.user_id, s.daily_report_time, a.address, a.ens_name FROM user_settings AS s "
+            "LEFT JOIN addresses AS a ON a.platform = s.platform AND a.user_id = s.user_id "
+            f"WHERE s.platform = ? AND s.daily_reports_enabled = 1 AND s.user_id IN ({placeholders}) "
+            "ORDER BY s.user_id, a.added_at",
+            (platform, *user_ids),
         )
+        return cursor.fetchall()
+
+    def _get_daily_users_sync(self, conn: sqlite3.Connection, platform: str) -> List[sqlite3.Row]:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT user_id, daily_report_time FROM user_settings WHERE platform = ? AND daily_reports_enabled = 1",
+            (platform,),
+        )
+        return cursor.fetchall()
+
+    async def get_daily_reports_enabled(self, platform: str, user_id: str) -> bool:
+        return (await self._get_settings(platform, user_id))["daily_reports_enabled"]
+
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        return {"addresses": self._addresses_cache.stats(), "settings": self._settings_cache.stats()}
+
+    async def add_usage_metrics(self, metrics: List[Tuple[Tuple[str, str, str, str], int]]) -> None:
+        await self._write(self._add_usage_metrics_sync, metrics)
+
+    def _add_usage_metrics_sync(self, metrics: List[Tuple[Tuple[str, str, str, str], int]]) -> None:
+        cursor = self._conn.cursor()
+        totals: Dict[str, Dict[str, int]] = {}
+        for (date_str, platform, kind, metric), value in metrics:
+            cursor.execute(
+                "INSERT INTO usage_metrics (date, platform, kind, metric, value) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (date, platform, kind, metric) DO UPDATE SET value = value + excluded.value",
+                (date_str, platform, kind, metric, value),
+            )
+            if metric == "reports" and kind in ("on_demand", "daily"):
+                day = totals.setdefault(date_str, {"on_demand": 0, "daily": 0})
+                day[kind] += value
+        for date_str, day in totals.items():
+            cursor.execute(
+                "INSERT OR IGNORE INTO usage_counters (date, on_demand_reports, daily_reports) VALUES (?, 0, 0)",
+                (date_str,),
+            )
+            cursor.execute(
+                "UPDATE usage_counters SET on_demand_reports = on_demand_reports + ?, daily_reports = daily_reports + ? WHERE date = ?",
+                (day["on_demand"], day["daily"], date_str),
+            )
         self._conn.commit()
 
     async def get_usage(self, date_str: str) -> Dict[str, int]:
-        async with self._lock:
-            row = await asyncio.to_thread(self._get_usage_sync, date_str)
+        row = await self._read(self._get_usage_sync, date_str)
         if not row:
             return {"on_demand_reports": 0, "daily_reports": 0}
         return dict(row)
 
-    def _get_usage_sync(self, date_str: str) -> Optional[sqlite3.Row]:
-        cursor = self._conn.cursor()
+    def _get_usage_sync(self, conn: sqlite3.Connection, date_str: str) -> Optional[sqlite3.Row]:
+        cursor = conn.cursor()
         cursor.execute("SELECT on_demand_reports, daily_reports FROM usage_counters WHERE date = ?", (date_str,))
         return cursor.fetchone()
 
     async def reset_usage(self, date_str: str) -> None:
-        async with self._lock:
-            await asyncio.to_thread(self._reset_usage_sync, date_str)
+        await self._write(self._reset_usage_sync, date_str)
 
     def _reset_usage_sync(self, date_str: str) -> None:
         cursor = self._conn.cursor()
@@ -188,3 +441,110 @@ class SQLiteStore:
             (date_str,),
         )
         self._conn.commit()
+
+    async def enqueue_outbox(self, platform: str, user_id: str, run_id: str, messages: List[dict]) -> int:
+        timestamp = datetime.utcnow().isoformat()
+        return await self._write(self._enqueue_outbox_sync, platform, user_id, run_id, messages, timestamp)
+
+    def _enqueue_outbox_sync(self, platform: str, user_id: str, run_id: str, messages: List[dict], timestamp: str) -> int:
+        cursor = self._conn.cursor()
+        inserted = 0
+        for seq, message in enumerate(messages):
+            cursor.execute(
+                "INSERT OR IGNORE INTO outbox (platform, user_id, run_id, seq, text, entities_json, with_keyboard, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    platform,
+                    user_id,
+                    run_id,
+                    seq,
+                    message["text"],
+                    json.dumps(message.get("entities") or []),
+                    1 if message.get("with_keyboard") else 0,
+                    timestamp,
+                ),
+            )
+            inserted += cursor.rowcount
+        self._conn.commit()
+        return inserted
+
+    async def get_outbox_users(self, platform: str, run_id: str) -> List[str]:
+        rows = await self._read(self._get_outbox_users_sync, platform, run_id)
+        return [row["user_id"] for row in rows]
+
+    def _get_outbox_users_sync(self, conn: sqlite3.Connection, platform: str, run_id: str) -> List[sqlite3.Row]:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT DISTINCT user_id FROM outbox WHERE platform = ? AND run_id = ?",
+            (platform, run_id),
+        )
+        return cursor.fetchall()
+
+    async def get_due_outbox(self, platform: str, limit: int) -> List[dict]:
+        rows = await self._read(self._get_due_outbox_sync, platform, limit, time.time())
+        result = []
+        for row in rows:
+            item = dict(row)
+            item["entities"] = json.loads(item.pop("entities_json") or "[]")
+            item["with_keyboard"] = bool(item["with_keyboard"])
+            result.append(item)
+        return result
+
+    def _get_due_outbox_sync(self, conn: sqlite3.Connection, platform: str, limit: int, now: float) -> List[sqlite3.Row]:
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT id, user_id, run_id, seq, text, entities_json, with_keyboard, attempts FROM outbox "
+            "WHERE platform = ? AND status = 'pending' AND next_attempt_at <= ? "
+            "ORDER BY user_id, run_id, seq LIMIT ?",
+            (platform, now, limit),
+        )
+        return cursor.fetchall()
+
+    async def mark_outbox_sent(self, row_id: int) -> None:
+        timestamp = datetime.utcnow().isoformat()
+        await self._write(self._mark_outbox_sent_sync, row_id, timestamp)
+
+    def _mark_outbox_sent_sync(self, row_id: int, timestamp: str) -> None:
+        cursor = self._conn.cursor()
+        cursor.execute(
+            "UPDATE outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL WHERE id = ?",
+            (timestamp, row_id),
+        )
+        self._conn.commit()
+
+    async def mark_outbox_failed(self, row_id: int, error: str, retry_at: Optional[float]) -> None:
+        await self._write(self._mark_outbox_failed_sync, row_id, error, retry_at)
+
+    def _mark_outbox_failed_sync(self, row_id: int, error: str, retry_at: Optional[float]) -> None:
+        cursor = self._conn.cursor()
+        if retry_at is None:
+            cursor.execute(
+                "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? WHERE id = ?",
+                (error, row_id),
+            )
+        else:
+            cursor.execute(
+                "UPDATE outbox SET attempts = attempts + 1, last_error = ?, next_attempt_at = ? WHERE id = ?",
+                (error, retry_at, row_id),
+            )
+            # Hold back the rest of the report so chunks are still delivered in order.
+            cursor.execute(
+                "UPDATE outbox SET next_attempt_at = MAX(next_attempt_at, ?) "
+                "WHERE status = 'pending' AND (platform, user_id, run_id) = "
+                "(SELECT platform, user_id, run_id FROM outbox WHERE id = ?) "
+                "AND seq > (SELECT seq FROM outbox WHERE id = ?)",
+                (retry_at, row_id, row_id),
+            )
+        self._conn.commit()
+
+    async def purge_outbox(self, before: str) -> int:
+        return await self._write(self._purge_outbox_sync, before)
+
+    def _purge_outbox_sync(self, before: str) -> int:
+        cursor = self._conn.cursor()
+        cursor.execute(
+            "DELETE FROM outbox WHERE status != 'pending' AND created_at < ?",
+            (before,),
+        )
+        self._conn.commit()
+        return cursor.rowcount
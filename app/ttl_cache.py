@@ -0,0 +1,79 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self._maxsize = max(1, maxsize)
+        self._ttl = ttl
+        self._data: OrderedDict[K, Tuple[V, Optional[float]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: K) -> bool:
+        return self.peek(key) is not None
+
+    def _expired(self, expires_at: Optional[float], now: float) -> bool:
+        return expires_at is not None and now >= expires_at
+
+    def peek(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None or self._expired(item[1], time.monotonic()):
+            return None
+        return item[0]
+
+    def get(self, key: K) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        value, expires_at = item
+        if self._expired(expires_at, time.monotonic()):
+            # Expired entries stay until evicted so get_stale can serve them while an upstream is down.
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def get_stale(self, key: K, max_stale: Optional[float] = None) -> Optional[V]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires_at = item
+        if max_stale is not None and expires_at is not None and time.monotonic() - expires_at > max_stale:
+            return None
+        return value
+
+    def set(self, key: K, value: V, ttl: Optional[float] = None) -> None:
+        ttl = self._ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        item = self._data.pop(key, None)
+        return item[0] if item is not None else None
+
+    def invalidate(self, predicate: Callable[[K], bool]) -> int:
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": len(self._data), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Optional, Tuple
+
+from .storage import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+UsageKey = Tuple[str, str, str, str]
+
+
+def latency_bucket(latency_ms: float) -> str:
+    for bound in LATENCY_BUCKETS_MS:
+        if latency_ms <= bound:
+            return f"latency_le_{bound}ms"
+    return f"latency_gt_{LATENCY_BUCKETS_MS[-1]}ms"
+
+
+class UsageRecorder:
+    def __init__(self, store: SQLiteStore, flush_interval: int = 60) -> None:
+        self._store = store
+        self._flush_interval = max(1, flush_interval)
+        self._pending: Counter[UsageKey] = Counter()
+        self._flush_lock = asyncio.Lock()
+
+    def record_report(self, platform: str, kind: str, latency: Optional[float] = None, ok: bool = True) -> None:
+        date_str = datetime.utcnow().date().isoformat()
+        self._pending[(date_str, platform, kind, "reports" if ok else "errors")] += 1
+        if latency is not None:
+            latency_ms = latency * 1000
+            self._pending[(date_str, platform, kind, latency_bucket(latency_ms))] += 1
+            self._pending[(date_str, platform, kind, "latency_ms_total")] += int(latency_ms)
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, Counter()
+            try:
+                await self._store.add_usage_metrics(list(pending.items()))
+            except Exception as exc:
+                logger.error("Usage flush failed: %s", exc)
+                self._pending.update(pending)
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        while not stop_event.is_set():
+            try:
+                await asyncio.wait_for(stop_event.wait(), timeout=self._flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
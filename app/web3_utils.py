@@ -1,73 +1,223 @@
 import asyncio
 import logging
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
 from web3 import Web3
 from ens import ENS
+from ens.utils import normalize_name, raw_name_to_hash
 
 from .chains import CHAIN_TO_ALCHEMY_PREFIX, CHAIN_TO_RPC_URL
+from .circuit import CircuitOpenError, breaker_states
+from .http import SharedHttpClient
+from .multicall import ENS_ADDR_SELECTOR, ENS_RESOLVER_SELECTOR, aggregate3, decode_address
+from .rpc import RpcPool
+from .singleflight import SingleFlight
+from .ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+ENS_REGISTRY_ADDRESS = "0x00000000000C2E074eC69A0dFb2997BA6C7d2e1e"
+ENS_CACHE_MAX_ENTRIES = 10000
+ENS_POSITIVE_TTL_SECONDS = 60 * 60
+ENS_NEGATIVE_TTL_SECONDS = 5 * 60
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+HEALTH_CHECK_INTERVAL_SECONDS = 30
+
+
 @dataclass
 class Web3Manager:
     api_key: str
+    http_client: Optional[SharedHttpClient] = None
+    extra_rpc_urls: Mapping[int, Sequence[str]] = field(default_factory=dict)
+    rpc_timeout: float = 10
 
     def __post_init__(self) -> None:
-        self._instances: dict[int, Web3] = {}
+        self._instances: dict[int, Tuple[str, Web3]] = {}
+        self._ens_w3: Optional[Web3] = None
+        self._pools: dict[int, RpcPool] = {}
+        self._health_task: Optional[asyncio.Task] = None
         self._ens: Optional[ENS] = None
+        self._flights = SingleFlight()
+        # Unresolvable names are cached as "" for the shorter negative TTL.
+        self._ens_cache: TTLCache[str, str] = TTLCache(ENS_CACHE_MAX_ENTRIES, ENS_POSITIVE_TTL_SECONDS)
 
-    def get_instance(self, chain_id: int) -> Optional[Web3]:
-        if chain_id in self._instances:
-            return self._instances[chain_id]
-
+    def _rpc_urls(self, chain_id: int) -> List[str]:
+        urls: List[str] = []
         prefix = CHAIN_TO_ALCHEMY_PREFIX.get(chain_id)
-        rpc_url = None
         if prefix and self.api_key:
-            rpc_url = f"https://{prefix}.g.alchemy.com/v2/{self.api_key}"
-        else:
-            rpc_url = CHAIN_TO_RPC_URL.get(chain_id)
+            urls.append(f"https://{prefix}.g.alchemy.com/v2/{self.api_key}")
+        if chain_id in CHAIN_TO_RPC_URL:
+            urls.append(CHAIN_TO_RPC_URL[chain_id])
+        for url in self.extra_rpc_urls.get(chain_id, ()):
+            if url not in urls:
+                urls.append(url)
+        return urls
+
+    def get_rpc(self, chain_id: int) -> Optional[RpcPool]:
+        if chain_id in self._pools:
+            return self._pools[chain_id]
+        if self.http_client is None:
+            logger.warning("No HTTP client configured; async RPC unavailable for chain %s", chain_id)
+            return None
+        urls = self._rpc_urls(chain_id)
+        if not urls:
+            logger.warning("No RPC URL configured for chain %s", chain_id)
+            return None
+        pool = RpcPool(self.http_client, chain_id, urls, self.rpc_timeout)
+        self._pools[chain_id] = pool
+        return pool
+
+    async def start(self, chain_ids: Iterable[int]) -> None:
+        pools = [pool for pool in (self.get_rpc(chain_id) for chain_id in chain_ids) if pool is not None]
+        await asyncio.gather(*[pool.check_health() for pool in pools])
+        if self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def stop(self) -> None:
+        if self._health_task:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(HEALTH_CHECK_INTERVAL_SECONDS)
+            try:
+                await asyncio.gather(*[pool.check_health() for pool in list(self._pools.values())])
+            except Exception as exc:
+                logger.error("RPC health check failed: %s", exc)
+            open_circuits = breaker_states()
+            if open_circuits:
+                logger.warning("Upstream circuits not closed: %s", open_circuits)
 
+    def get_instance(self, chain_id: int) -> Optional[Web3]:
+        pool = self.get_rpc(chain_id)
+        rpc_url = pool.best_url() if pool else next(iter(self._rpc_urls(chain_id)), None)
         if not rpc_url:
             logger.warning("No RPC URL configured for chain %s", chain_id)
             return None
 
-        try:
-            w3 = Web3(Web3.HTTPProvider(rpc_url))
-            if w3.is_connected():
-                self._instances[chain_id] = w3
-                logger.info("Initialized Web3 for chain %s", chain_id)
-                return w3
-            logger.error("Failed to connect Web3 for chain %s", chain_id)
-        except Exception as exc:
-            logger.error("Error initializing Web3 for chain %s: %s", chain_id, exc)
-        return None
+        # Follow the pool's current best endpoint; providers connect lazily, so this never blocks.
+        cached = self._instances.get(chain_id)
+        if cached is not None and cached[0] == rpc_url:
+            return cached[1]
+        w3 = Web3(Web3.HTTPProvider(rpc_url, request_kwargs={"timeout": self.rpc_timeout}))
+        self._instances[chain_id] = (rpc_url, w3)
+        return w3
 
     def init_ens(self) -> None:
-        if self._ens is not None:
-            return
         w3 = self.get_instance(1)
         if not w3:
             logger.error("Ethereum Web3 not available; ENS disabled")
             self._ens = None
             return
+        if self._ens is not None and self._ens_w3 is w3:
+            return
         try:
             self._ens = ENS.from_web3(w3)
+            self._ens_w3 = w3
             logger.info("ENS resolver initialized")
         except Exception as exc:
             logger.error("Failed to initialize ENS: %s", exc)
             self._ens = None
 
-    async def resolve_ens(self, name: str) -> Optional[str]:
-        if self._ens is None:
-            self.init_ens()
+    async def resolve_ens_many(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        results: Dict[str, Optional[str]] = {}
+        pending: Dict[str, List[str]] = {}
+        for name in names:
+            try:
+                normalized = normalize_name(name)
+            except Exception:
+                results[name] = None
+                continue
+            cached = self._ens_cache.get(normalized)
+            if cached is not None:
+                results[name] = cached or None
+            else:
+                pending.setdefault(normalized, []).append(name)
+
+        if pending:
+            keys = [("ens", normalized) for normalized in pending]
+            try:
+                resolved = await self._flights.do_many(keys, self._resolve_ens_batch)
+            except Exception as exc:
+                logger.error("ENS batch resolution failed: %s", exc)
+                resolved = {}
+            for normalized, originals in pending.items():
+                for name in originals:
+                    results[name] = resolved.get(("ens", normalized))
+        return results
+
+    async def _resolve_ens_batch(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], Optional[str]]:
+        names = [normalized for _kind, normalized in keys]
+        rpc = self.get_rpc(1)
+        if rpc is not None and rpc.breaker.blocked:
+            # Both lookup paths go through Ethereum RPC; fail fast and leave the names uncached.
+            raise CircuitOpenError("Ethereum RPC circuit open; ENS unavailable")
+        try:
+            addresses = await self._resolve_ens_onchain(names)
+        except CircuitOpenError:
+            raise
+        except Exception as exc:
+            logger.warning("On-chain ENS lookup failed; falling back per name: %s", exc)
+            addresses = {}
+        unresolved = [name for name in names if addresses.get(name) is None]
+        if unresolved:
+            fallbacks = await asyncio.gather(*[self._resolve_ens_fallback(name) for name in unresolved])
+            addresses.update(zip(unresolved, fallbacks))
+
+        results: Dict[Tuple[str, str], Optional[str]] = {}
+        for name in names:
+            address = addresses.get(name)
+            if address is False:
+                # Lookup errored; leave it uncached so the next attempt retries.
+                results[("ens", name)] = None
+                continue
+            if address:
+                self._ens_cache.set(name, address)
+            else:
+                self._ens_cache.set(name, "", ttl=ENS_NEGATIVE_TTL_SECONDS)
+            results[("ens", name)] = address or None
+        return results
+
+    async def _resolve_ens_onchain(self, names: List[str]) -> Dict[str, Optional[str]]:
+        rpc = self.get_rpc(1)
+        if rpc is None:
+            return {}
+        nodes = [raw_name_to_hash(name) for name in names]
+        resolver_results = await aggregate3(
+            rpc.eth_call,
+            [(ENS_REGISTRY_ADDRESS, ENS_RESOLVER_SELECTOR + node) for node in nodes],
+            chain_id=1,
+        )
+        addr_calls = []
+        addr_names = []
+        for name, node, raw in zip(names, nodes, resolver_results):
+            resolver = decode_address(raw)
+            # No resolver here may still mean a wildcard resolver on a parent name; the fallback handles that.
+            if resolver and resolver != ZERO_ADDRESS:
+                addr_calls.append((resolver, ENS_ADDR_SELECTOR + node))
+                addr_names.append(name)
+        if not addr_calls:
+            return {}
+
+        addr_results = await aggregate3(rpc.eth_call, addr_calls, chain_id=1)
+        addresses: Dict[str, Optional[str]] = {}
+        for name, raw in zip(addr_names, addr_results):
+            address = decode_address(raw)
+            if address is None:
+                continue
+            addresses[name] = address if address != ZERO_ADDRESS else ""
+        return addresses
+
+    async def _resolve_ens_fallback(self, name: str) -> Union[str, bool]:
+        self.init_ens()
         if self._ens is None:
-            return None
+            return False
         try:
             loop = asyncio.get_running_loop()
-            address = await loop.run_in_executor(None, self._ens.address, name)
-            return address
+            return await loop.run_in_executor(None, self._ens.address, name) or ""
         except Exception as exc:
             logger.error("ENS resolution failed for %s: %s", name, exc)
-            return None
+            return False
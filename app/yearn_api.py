@@ -1,14 +1,25 @@
 import asyncio
+import gzip
+import json
 import logging
-from datetime import datetime
+import os
+from collections import deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Optional, Tuple
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
 
 from web3 import Web3
 
-from .abis import ONE_UP_GAUGE_ABI
+from .catalog import VaultCatalog
+from .circuit import CircuitOpenError, circuit_breaker
 from .http import SharedHttpClient
+from .singleflight import SingleFlight
+from .ttl_cache import TTLCache
+from .multicall import ASSET_SELECTOR, aggregate3, decode_address
 from .web3_utils import Web3Manager
+from .yields import YieldStats, compute_yield_stats
 
 logger = logging.getLogger(__name__)
 
@@ -16,24 +27,210 @@ ONE_UP_API_URL = "https://1up.s3.pl-waw.scw.cloud/aprs.json"
 YDAEMON_URL = "https://ydaemon.yearn.fi/vaults/detected?limit=2000"
 KONG_URL = "https://kong.yearn.farm/api/gql"
 
+SNAPSHOT_VERSION = 1
+
+KONG_LOOKBACK_DAYS = 30
+# Fetch a little before the look-back cutoff so the 30d anchor has a point at or before it.
+KONG_FETCH_SLACK_SECONDS = 2 * 24 * 60 * 60
+
+KONG_BATCH_INITIAL = 25
+KONG_BATCH_MIN = 1
+KONG_BATCH_MAX = 100
+KONG_BATCH_STEP = 5
+KONG_BATCH_CONCURRENCY = 8
+# Series missing from a partial Kong refresh are retried on their own, backing off between attempts.
+KONG_RETRY_BASE_SECONDS = 60
+KONG_RETRY_MAX_SECONDS = 30 * 60
+# Vaults Kong has no series for are remembered so reports holding them skip the live lookup.
+KONG_EMPTY_CACHE_MAX_ENTRIES = 10000
+KONG_EMPTY_TTL_SECONDS = 60 * 60
+
+KONG_TIMESERIES_QUERY = """
+query Query($label: String!, $chainId: Int, $address: String, $component: String, $limit: Int) {
+  timeseries(label: $label, chainId: $chainId, address: $address, component: $component, limit: $limit) {
+    time
+    value
+  }
+}
+"""
+
+KONG_TIMESERIES_SINCE_QUERY = """
+query Query($label: String!, $chainId: Int, $address: String, $component: String, $limit: Int, $timestamp: BigInt) {
+  timeseries(label: $label, chainId: $chainId, address: $address, component: $component, limit: $limit, timestamp: $timestamp) {
+    time
+    value
+  }
+}
+"""
+
+
+def kong_lookback_cutoff() -> int:
+    return int((datetime.utcnow() - timedelta(days=KONG_LOOKBACK_DAYS)).timestamp())
+
+
+def merge_timeseries(existing: list, new_points: list, cutoff: int) -> list:
+    by_time: Dict[int, dict] = {}
+    for entry in list(existing) + list(new_points):
+        try:
+            point_time = int(entry["time"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if entry.get("value") is None:
+            continue
+        by_time[point_time] = {"time": point_time, "value": entry["value"]}
+    merged = [by_time[t] for t in sorted(by_time)]
+
+    anchor_idx = 0
+    for idx, entry in enumerate(merged):
+        if entry["time"] <= cutoff:
+            anchor_idx = idx
+        else:
+            break
+    return merged[anchor_idx:]
+
+
+def build_yield_table(
+    kong_data: Mapping[Tuple[int, str], list],
+    previous: Optional[Mapping[Tuple[int, str], YieldStats]] = None,
+    changed: Optional[Set[Tuple[int, str]]] = None,
+) -> Dict[Tuple[int, str], YieldStats]:
+    now = datetime.utcnow()
+    table: Dict[Tuple[int, str], YieldStats] = {}
+    for key, series in kong_data.items():
+        if previous is not None and changed is not None and key not in changed:
+            if key in previous:
+                table[key] = previous[key]
+            continue
+        stats = compute_yield_stats(series, now)
+        if stats is not None:
+            table[key] = stats
+    return table
+
+
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Background cache refresh failed: %s", task.exception())
+
+
+def _write_snapshot(path: str, payload: dict) -> None:
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with gzip.open(tmp_path, "wt", encoding="utf-8") as fh:
+        json.dump(payload, fh, separators=(",", ":"))
+    os.replace(tmp_path, path)
+
+
+def _read_snapshot(path: str) -> dict:
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    data: Any = None
+    timestamp: float = 0
+
+
+@dataclass(frozen=True)
+class KongUpdate:
+    changed: bool
+    complete: bool
+
+
+@dataclass(frozen=True)
+class CacheGeneration:
+    generation: int = 0
+    ydaemon: CacheEntry = field(default_factory=CacheEntry)
+    catalog: Optional[VaultCatalog] = None
+    kong: CacheEntry = field(default_factory=lambda: CacheEntry(MappingProxyType({})))
+    yields: Mapping[Tuple[int, str], YieldStats] = field(default_factory=lambda: MappingProxyType({}))
+    one_up: CacheEntry = field(default_factory=CacheEntry)
+    one_up_gauge_map: CacheEntry = field(default_factory=lambda: CacheEntry(MappingProxyType({})))
+
+
 class YearnApi:
-    def __init__(self, http_client: SharedHttpClient, web3_manager: Web3Manager, cache_expiry_seconds: int) -> None:
+    def __init__(
+        self,
+        http_client: SharedHttpClient,
+        web3_manager: Web3Manager,
+        cache_expiry_seconds: int,
+        snapshot_path: Optional[str] = None,
+    ) -> None:
         self._http = http_client
         self._web3_manager = web3_manager
         self._cache_expiry_seconds = cache_expiry_seconds
-        self._cache = {
-            "ydaemon": {"data": None, "timestamp": 0},
-            "kong": {"data": {}, "timestamp": 0},
-            "1up": {"data": None, "timestamp": 0},
-            "1up_gauge_map": {"data": {}, "timestamp": 0},
-        }
+        self._snapshot_path = snapshot_path
+        self._current = CacheGeneration()
+        self._flights = SingleFlight()
+        self._kong_batch_size = KONG_BATCH_INITIAL
+        self._kong_missing: Dict[Tuple[int, str], str] = {}
+        self._kong_retries = 0
+        self._kong_retry_at = 0.0
+        self._kong_empty: TTLCache[Tuple[int, str], bool] = TTLCache(KONG_EMPTY_CACHE_MAX_ENTRIES, KONG_EMPTY_TTL_SECONDS)
+
+    def snapshot(self) -> CacheGeneration:
+        return self._current
+
+    @property
+    def generation(self) -> int:
+        return self._current.generation
+
+    def _publish(self, **changes) -> CacheGeneration:
+        self._current = replace(self._current, generation=self._current.generation + 1, **changes)
+        return self._current
+
+    def _extend(self, **changes) -> CacheGeneration:
+        # Adds entries for vaults nobody had data for yet. Existing data is unchanged, so the generation
+        # number (which report cache keys depend on) stays put.
+        self._current = replace(self._current, **changes)
+        return self._current
+
+    def _is_fresh(self, entry: CacheEntry, horizon: float = 0) -> bool:
+        now = datetime.utcnow().timestamp() + horizon
+        return entry.data is not None and (now - entry.timestamp < self._cache_expiry_seconds)
+
+    def _all_fresh(self, horizon: float = 0) -> bool:
+        current = self._current
+        return all(self._is_fresh(entry, horizon) for entry in (current.ydaemon, current.kong, current.one_up))
+
+    def _serve(self, entry: CacheEntry, label: str) -> Any:
+        if entry.data is not None and not self._is_fresh(entry):
+            logger.debug("%s cache stale; serving previous generation", label)
+            self.refresh_in_background()
+        return entry.data
+
+    def _kong_retry_due(self) -> bool:
+        return bool(self._kong_missing) and datetime.utcnow().timestamp() >= self._kong_retry_at
+
+    def refresh_if_stale(self) -> None:
+        if not self._all_fresh() or self._kong_retry_due():
+            self.refresh_in_background()
 
-    def _is_fresh(self, key: str) -> bool:
-        now = datetime.utcnow().timestamp()
-        return self._cache[key]["data"] is not None and (now - self._cache[key]["timestamp"] < self._cache_expiry_seconds)
+    async def refresh(self) -> None:
+        await self._flights.do("refresh", self._update_all_caches)
 
-    async def update_ydaemon_cache(self) -> bool:
-        if self._is_fresh("ydaemon"):
+    async def refresh_ahead(self, horizon: float) -> None:
+        await self.refresh()
+        if not self._all_fresh(horizon):
+            await self._flights.do("refresh", lambda: self._update_all_caches(horizon))
+
+    def refresh_in_background(self) -> None:
+        if self._flights.in_flight("refresh"):
+            return
+        task = asyncio.ensure_future(self.refresh())
+        task.add_done_callback(_log_refresh_failure)
+
+    async def update_ydaemon_cache(self, horizon: float = 0) -> bool:
+        return await self._flights.do("ydaemon", lambda: self._update_ydaemon_cache(horizon))
+
+    async def _update_ydaemon_cache(self, horizon: float = 0) -> bool:
+        if self._is_fresh(self._current.ydaemon, horizon):
+            return False
+        breaker = circuit_breaker("ydaemon")
+        if not breaker.allow():
+            logger.info("yDaemon circuit open; keeping cached data")
             return False
         logger.info("Updating yDaemon cache")
         try:
@@ -41,39 +238,109 @@ class YearnApi:
             async with session.get(YDAEMON_URL, timeout=30) as response:
                 if response.status == 200:
                     data = await response.json()
-                    self._cache["ydaemon"]["data"] = data
-                    self._cache["ydaemon"]["timestamp"] = datetime.utcnow().timestamp()
+                    breaker.record_success()
+                    catalog = VaultCatalog.from_ydaemon(data).with_one_up_gauges(self._current.one_up_gauge_map.data)
+                    self._publish(ydaemon=CacheEntry(data, datetime.utcnow().timestamp()), catalog=catalog)
                     logger.info("yDaemon cache updated: %s vaults", len(data))
                     return True
                 logger.error("yDaemon fetch failed: status %s", response.status)
         except Exception as exc:
             logger.error("yDaemon fetch failed: %s", exc)
+        breaker.record_failure()
         return False
 
-    async def update_kong_cache(self, vaults_to_update: list[Tuple[int, str]]) -> None:
+    async def update_kong_cache(self, vaults_to_update: list[Tuple[int, str]]) -> KongUpdate:
+        key = ("kong", frozenset((chain_id, address.lower()) for chain_id, address in vaults_to_update))
+        return await self._flights.do(key, lambda: self._update_kong_cache(vaults_to_update))
+
+    async def _update_kong_cache(self, vaults_to_update: list[Tuple[int, str]], retry: bool = False) -> KongUpdate:
         if not vaults_to_update:
             logger.info("No vaults provided for Kong cache update")
-            return
+            return KongUpdate(changed=False, complete=True)
 
         logger.info("Updating Kong cache for %s vaults", len(vaults_to_update))
-        semaphore = asyncio.Semaphore(200)
-        new_kong_data: Dict[Tuple[int, str], list] = {}
+        existing_data = self._current.kong.data
+        cutoff = kong_lookback_cutoff()
+
+        requests = []
+        for chain_id, address in vaults_to_update:
+            existing = existing_data.get((chain_id, address.lower())) or []
+            since = int(existing[-1]["time"]) if existing else cutoff - KONG_FETCH_SLACK_SECONDS
+            requests.append((chain_id, address, since))
+
+        fetched = await self.fetch_kong_timeseries_batch(requests)
+        if not fetched:
+            # Nothing came back (Kong down or circuit open); keep the old timestamp so the next refresh retries.
+            logger.warning("Kong cache update fetched no series; keeping cached data")
+            if retry:
+                self._schedule_kong_retry(self._kong_missing)
+            return KongUpdate(changed=False, complete=False)
 
-        async def fetch_one(chain_id: int, address: str) -> None:
-            async with semaphore:
-                data = await self.fetch_historical_pricepershare_kong(address, chain_id)
-                if data:
-                    new_kong_data[(chain_id, address.lower())] = data
+        # Merge into whatever is cached now: series outside this update, and any fetched on demand while it
+        # ran, are kept as they are.
+        current = self._current
+        new_kong_data: Dict[Tuple[int, str], list] = dict(current.kong.data)
+        changed = set()
+        for chain_id, address in vaults_to_update:
+            key = (chain_id, address.lower())
+            existing = new_kong_data.get(key) or []
+            merged = merge_timeseries(existing, fetched.get(key) or [], cutoff)
+            if merged:
+                new_kong_data[key] = merged
+                self._kong_empty.pop(key)
+                if merged != existing:
+                    changed.add(key)
+            elif key in fetched:
+                self._kong_empty.set(key, True)
 
-        tasks = [fetch_one(chain_id, address) for chain_id, address in vaults_to_update]
-        await asyncio.gather(*tasks)
+        # The series that came back are fresh; a retry of stragglers leaves the refresh time alone.
+        timestamp = current.kong.timestamp if retry else datetime.utcnow().timestamp()
+        kong = CacheEntry(MappingProxyType(new_kong_data), timestamp)
+        if changed:
+            # Only series that gained or lost points are recomputed; the rest keep their stats.
+            self._publish(kong=kong, yields=MappingProxyType(build_yield_table(new_kong_data, current.yields, changed)))
+        else:
+            self._extend(kong=kong)
 
-        self._cache["kong"]["data"] = new_kong_data
-        self._cache["kong"]["timestamp"] = datetime.utcnow().timestamp()
-        logger.info("Kong cache updated for %s vaults", len(new_kong_data))
+        missing = {
+            (chain_id, address.lower()): address
+            for chain_id, address in vaults_to_update
+            if (chain_id, address.lower()) not in fetched
+        }
+        self._schedule_kong_retry(missing)
+        if missing:
+            logger.warning(
+                "Kong cache partially updated (%s of %s series); retrying the rest in %.0fs",
+                len(fetched),
+                len(requests),
+                self._kong_retry_at - datetime.utcnow().timestamp(),
+            )
+        else:
+            logger.info("Kong cache updated for %s vaults (%s changed)", len(vaults_to_update), len(changed))
+        return KongUpdate(changed=bool(changed), complete=not missing)
+
+    def _schedule_kong_retry(self, missing: Dict[Tuple[int, str], str]) -> None:
+        self._kong_missing = missing
+        if not missing:
+            self._kong_retries = 0
+            return
+        delay = min(KONG_RETRY_BASE_SECONDS * 2**self._kong_retries, KONG_RETRY_MAX_SECONDS, self._cache_expiry_seconds)
+        self._kong_retries += 1
+        self._kong_retry_at = datetime.utcnow().timestamp() + delay
 
-    async def update_1up_cache(self) -> bool:
-        if self._is_fresh("1up"):
+    async def _retry_kong_misses(self) -> KongUpdate:
+        vaults = [(chain_id, address) for (chain_id, _lower), address in self._kong_missing.items()]
+        return await self._update_kong_cache(vaults, retry=True)
+
+    async def update_1up_cache(self, horizon: float = 0) -> bool:
+        return await self._flights.do("1up", lambda: self._update_1up_cache(horizon))
+
+    async def _update_1up_cache(self, horizon: float = 0) -> bool:
+        if self._is_fresh(self._current.one_up, horizon):
+            return False
+        breaker = circuit_breaker("1up")
+        if not breaker.allow():
+            logger.info("1UP circuit open; keeping cached data")
             return False
         logger.info("Updating 1UP cache")
         try:
@@ -81,60 +348,68 @@ class YearnApi:
             async with session.get(ONE_UP_API_URL, timeout=15) as response:
                 if response.status != 200:
                     logger.error("1UP fetch failed: status %s", response.status)
+                    breaker.record_failure()
                     return False
                 content_type = response.headers.get("Content-Type", "").lower()
                 if "application/json" not in content_type:
                     text = await response.text()
                     logger.error("1UP unexpected content type: %s (%s)", content_type, text[:200])
+                    breaker.record_failure()
                     return False
                 data = await response.json()
+                breaker.record_success()
                 if isinstance(data, dict) and "gauges" in data and isinstance(data["gauges"], dict):
                     processed = data.copy()
                     processed["gauges"] = {k.lower(): v for k, v in data["gauges"].items()}
-                    self._cache["1up"]["data"] = processed
-                    self._cache["1up"]["timestamp"] = datetime.utcnow().timestamp()
+                    self._publish(one_up=CacheEntry(processed, datetime.utcnow().timestamp()))
                     logger.info("1UP cache updated: %s gauges", len(processed["gauges"]))
                     return True
                 logger.error("Unexpected 1UP data structure")
         except Exception as exc:
             logger.error("1UP fetch failed: %s", exc)
+            breaker.record_failure()
         return False
 
     async def update_1up_gauge_map_cache(self) -> bool:
-        one_up_data = self._cache["1up"].get("data")
+        return await self._flights.do("1up_gauge_map", self._update_1up_gauge_map_cache)
+
+    async def _update_1up_gauge_map_cache(self) -> bool:
+        one_up_data = self._current.one_up.data
         if not one_up_data or "gauges" not in one_up_data:
             logger.warning("Cannot update 1UP gauge map: missing 1UP data")
             return False
 
-        w3 = self._web3_manager.get_instance(1)
-        if not w3:
-            logger.error("Cannot update 1UP gauge map: Ethereum Web3 unavailable")
+        rpc = self._web3_manager.get_rpc(1)
+        if not rpc or rpc.breaker.blocked:
+            logger.error("Cannot update 1UP gauge map: Ethereum RPC unavailable")
             return False
 
-        gauges = list(one_up_data["gauges"].keys())
-        gauge_map: Dict[str, str] = {}
-        semaphore = asyncio.Semaphore(10)
-
-        async def fetch_asset(gauge_address: str) -> None:
+        gauges = []
+        for gauge_address in one_up_data["gauges"].keys():
             if not Web3.is_address(gauge_address):
                 logger.warning("Invalid 1UP gauge address: %s", gauge_address)
-                return
-            try:
-                checksum = Web3.to_checksum_address(gauge_address)
-                contract = w3.eth.contract(address=checksum, abi=ONE_UP_GAUGE_ABI)
-                loop = asyncio.get_running_loop()
-                async with semaphore:
-                    asset_address = await loop.run_in_executor(None, contract.functions.asset().call)
-                if asset_address and Web3.is_address(asset_address):
-                    gauge_map[checksum.lower()] = Web3.to_checksum_address(asset_address).lower()
-            except Exception as exc:
-                logger.error("Failed 1UP asset() for %s: %s", gauge_address, exc)
-
-        await asyncio.gather(*[fetch_asset(addr) for addr in gauges])
+                continue
+            gauges.append(gauge_address.lower())
+
+        try:
+            results = await aggregate3(rpc.eth_call, [(gauge, ASSET_SELECTOR) for gauge in gauges], 1)
+        except Exception as exc:
+            logger.error("1UP gauge map update failed: %s", exc)
+            return False
+        gauge_map: Dict[str, str] = {}
+        for gauge_address, return_data in zip(gauges, results):
+            asset_address = decode_address(return_data)
+            if asset_address:
+                gauge_map[gauge_address] = asset_address.lower()
+            else:
+                logger.error("Failed 1UP asset() for %s", gauge_address)
 
         if gauge_map:
-            self._cache["1up_gauge_map"]["data"] = gauge_map
-            self._cache["1up_gauge_map"]["timestamp"] = datetime.utcnow().timestamp()
+            catalog = self._current.catalog
+            self._publish(
+                one_up_gauge_map=CacheEntry(MappingProxyType(gauge_map), datetime.utcnow().timestamp()),
+                catalog=catalog.with_one_up_gauges(gauge_map) if catalog is not None else None,
+            )
             logger.info("1UP gauge map updated for %s gauges", len(gauge_map))
             return True
 
@@ -142,59 +417,158 @@ class YearnApi:
         return False
 
     async def update_all_caches(self) -> None:
-        await self.update_ydaemon_cache()
-        oneup_ok = await self.update_1up_cache()
+        await self.refresh()
+
+    async def _update_all_caches(self, horizon: float = 0) -> None:
+        changed = await self.update_ydaemon_cache(horizon)
+        oneup_ok = await self.update_1up_cache(horizon)
+        changed = oneup_ok or changed
         if oneup_ok:
-            await self.update_1up_gauge_map_cache()
-        if self._cache["ydaemon"]["data"] and not self._is_fresh("kong"):
-            vaults_for_kong = {
-                (vault.get("chainID"), vault.get("address"))
-                for vault in self._cache["ydaemon"]["data"]
-                if vault.get("chainID") and vault.get("address")
-            }
-            await self.update_kong_cache(list(vaults_for_kong))
+            changed = await self.update_1up_gauge_map_cache() or changed
+        catalog = self._current.catalog
+        if catalog and not self._is_fresh(self._current.kong, horizon):
+            vaults_for_kong = {(record.chain_id, record.address) for record in catalog.records}
+            changed = (await self.update_kong_cache(list(vaults_for_kong))).changed or changed
+        elif self._kong_retry_due():
+            changed = (await self._retry_kong_misses()).changed or changed
+        if changed:
+            await self.save_snapshot()
+
+    async def save_snapshot(self) -> None:
+        if not self._snapshot_path:
+            return
+        current = self._current
+        payload = {
+            "version": SNAPSHOT_VERSION,
+            "saved_at": datetime.utcnow().timestamp(),
+            "ydaemon": {"data": current.ydaemon.data, "timestamp": current.ydaemon.timestamp},
+            "kong": {
+                "data": [[chain_id, address, series] for (chain_id, address), series in current.kong.data.items()],
+                "timestamp": current.kong.timestamp,
+            },
+            "1up": {"data": current.one_up.data, "timestamp": current.one_up.timestamp},
+            "1up_gauge_map": {"data": dict(current.one_up_gauge_map.data), "timestamp": current.one_up_gauge_map.timestamp},
+        }
+        try:
+            await asyncio.to_thread(_write_snapshot, self._snapshot_path, payload)
+            logger.info("Cache snapshot saved to %s", self._snapshot_path)
+        except Exception as exc:
+            logger.error("Failed to save cache snapshot: %s", exc)
+
+    async def load_snapshot(self) -> bool:
+        if not self._snapshot_path or not os.path.exists(self._snapshot_path):
+            return False
+        try:
+            payload = await asyncio.to_thread(_read_snapshot, self._snapshot_path)
+        except Exception as exc:
+            logger.error("Failed to read cache snapshot %s: %s", self._snapshot_path, exc)
+            return False
+        if not isinstance(payload, dict) or payload.get("version") != SNAPSHOT_VERSION:
+            logger.warning("Ignoring cache snapshot with unsupported version")
+            return False
+        if not payload.get("ydaemon", {}).get("data"):
+            return False
+
+        cutoff = kong_lookback_cutoff()
+        kong_data = {
+            (chain_id, address): merge_timeseries(series, [], cutoff) for chain_id, address, series in payload["kong"]["data"]
+        }
+        gauge_map = payload["1up_gauge_map"]["data"] or {}
+        catalog = VaultCatalog.from_ydaemon(payload["ydaemon"]["data"]).with_one_up_gauges(gauge_map)
+        self._publish(
+            ydaemon=CacheEntry(payload["ydaemon"]["data"], payload["ydaemon"]["timestamp"]),
+            catalog=catalog,
+            kong=CacheEntry(MappingProxyType(kong_data), payload["kong"]["timestamp"]),
+            yields=MappingProxyType(build_yield_table(kong_data)),
+            one_up=CacheEntry(payload["1up"]["data"], payload["1up"]["timestamp"]),
+            one_up_gauge_map=CacheEntry(MappingProxyType(gauge_map), payload["1up_gauge_map"]["timestamp"]),
+        )
+        logger.info("Loaded cache snapshot: %s vaults, %s Kong series", len(catalog), len(kong_data))
+        return True
 
     async def ensure_ydaemon_cache(self) -> None:
-        if not self._is_fresh("ydaemon"):
+        if self._current.catalog is None:
             await self.update_ydaemon_cache()
+        elif not self._is_fresh(self._current.ydaemon):
+            self.refresh_in_background()
 
-    def get_ydaemon_data(self) -> Optional[list]:
-        if self._is_fresh("ydaemon"):
-            return self._cache["ydaemon"]["data"]
-        logger.warning("yDaemon cache stale")
-        return self._cache["ydaemon"]["data"]
-
-    async def get_kong_data(self, vault_address: str, chain_id: int) -> Optional[list]:
-        cache_key = (chain_id, vault_address.lower())
-        if self._is_fresh("kong") and cache_key in self._cache["kong"]["data"]:
-            return self._cache["kong"]["data"][cache_key]
-        data = await self.fetch_historical_pricepershare_kong(vault_address, chain_id)
-        if data:
-            self._cache["kong"]["data"][cache_key] = data
-            self._cache["kong"]["timestamp"] = datetime.utcnow().timestamp()
-        return data
-
-    def get_1up_data(self) -> Optional[dict]:
-        if self._is_fresh("1up"):
-            return self._cache["1up"]["data"]
-        logger.warning("1UP cache stale")
-        return self._cache["1up"].get("data")
-
-    def get_1up_gauge_map(self) -> Optional[dict]:
-        if self._is_fresh("1up_gauge_map"):
-            return self._cache["1up_gauge_map"]["data"]
-        logger.warning("1UP gauge map cache stale")
-        return self._cache["1up_gauge_map"].get("data")
-
-    async def fetch_historical_pricepershare_kong(self, vault_address: str, chain_id: int, limit: int = 1000) -> Optional[list]:
-        query = """
-        query Query($label: String!, $chainId: Int, $address: String, $component: String, $limit: Int) {
-          timeseries(label: $label, chainId: $chainId, address: $address, component: $component, limit: $limit) {
-            time
-            value
-          }
-        }
-        """
+    def get_vault_catalog(self) -> Optional[VaultCatalog]:
+        self._serve(self._current.ydaemon, "yDaemon")
+        return self._current.catalog
+
+    async def get_kong_data_many(self, vaults: Iterable[Tuple[int, str]]) -> Dict[Tuple[int, str], list]:
+        kong_data = self._serve(self._current.kong, "Kong")
+        results: Dict[Tuple[int, str], list] = {}
+        addresses: Dict[Tuple[int, str], str] = {}
+        for chain_id, address in vaults:
+            key = (chain_id, address.lower())
+            existing = kong_data.get(key)
+            if existing:
+                results[key] = existing
+            elif key not in self._kong_empty:
+                addresses[key] = address
+
+        if addresses:
+            fetched = await self._flights.do_many(
+                list(addresses),
+                lambda keys: self._fetch_kong_misses([(key, addresses[key]) for key in keys]),
+            )
+            results.update(fetched)
+        return results
+
+    async def _fetch_kong_misses(self, misses: List[Tuple[Tuple[int, str], str]]) -> Dict[Tuple[int, str], list]:
+        cutoff = kong_lookback_cutoff()
+        requests = [(chain_id, address, cutoff - KONG_FETCH_SLACK_SECONDS) for (chain_id, _lower), address in misses]
+        fetched = await self.fetch_kong_timeseries_batch(requests)
+        additions: Dict[Tuple[int, str], list] = {}
+        for key, _address in misses:
+            merged = merge_timeseries([], fetched.get(key) or [], cutoff)
+            if merged:
+                additions[key] = merged
+            elif key in fetched:
+                self._kong_empty.set(key, True)
+        if additions:
+            current = self._current
+            self._extend(
+                kong=CacheEntry(MappingProxyType({**current.kong.data, **additions}), current.kong.timestamp),
+                yields=MappingProxyType({**current.yields, **build_yield_table(additions)}),
+            )
+        return additions
+
+    async def get_yield_stats_many(
+        self,
+        vaults: Iterable[Tuple[int, str]],
+        generation: Optional[CacheGeneration] = None,
+    ) -> Dict[Tuple[int, str], YieldStats]:
+        generation = generation or self._current
+        self._serve(generation.kong, "Kong")
+        yields = generation.yields
+        results: Dict[Tuple[int, str], YieldStats] = {}
+        misses = []
+        for chain_id, address in vaults:
+            key = (chain_id, address.lower())
+            stats = yields.get(key)
+            if stats is not None:
+                results[key] = stats
+            else:
+                misses.append((chain_id, address))
+        if misses:
+            await self.get_kong_data_many(misses)
+            yields = self._current.yields
+            for chain_id, address in misses:
+                key = (chain_id, address.lower())
+                stats = yields.get(key)
+                if stats is not None:
+                    results[key] = stats
+        return results
+
+    async def fetch_historical_pricepershare_kong(
+        self,
+        vault_address: str,
+        chain_id: int,
+        limit: int = 1000,
+        since: Optional[int] = None,
+    ) -> Optional[list]:
         variables = {
             "label": "pps",
             "chainId": chain_id,
@@ -202,26 +576,136 @@ class YearnApi:
             "component": "humanized",
             "limit": limit,
         }
+        query = KONG_TIMESERIES_QUERY
+        if since is not None:
+            variables["timestamp"] = str(since)
+            query = KONG_TIMESERIES_SINCE_QUERY
+        breaker = circuit_breaker("kong")
+        if not breaker.allow():
+            return None
         try:
             session = self._http.session
             async with session.post(KONG_URL, json={"query": query, "variables": variables}, timeout=20) as response:
                 if response.status != 200:
                     logger.error("Kong fetch failed: %s", response.status)
+                    breaker.record_failure()
                     return None
                 data = await response.json()
-                if "data" in data and "timeseries" in data["data"]:
-                    timeseries = data["data"]["timeseries"]
-                    if isinstance(timeseries, list):
-                        return timeseries
+                breaker.record_success()
+                timeseries = (data.get("data") or {}).get("timeseries")
+                if isinstance(timeseries, list):
+                    return timeseries
+                if since is not None and data.get("errors"):
+                    logger.warning("Kong rejected incremental query for %s, refetching full series", vault_address)
+                    return await self.fetch_historical_pricepershare_kong(vault_address, chain_id, limit)
         except Exception as exc:
             logger.error("Kong fetch error for %s: %s", vault_address, exc)
+            breaker.record_failure()
         return None
 
-    def cache_timestamps(self) -> Dict[str, float]:
+    async def fetch_kong_timeseries_batch(
+        self,
+        requests: List[Tuple[int, str, Optional[int]]],
+        limit: int = 1000,
+    ) -> Dict[Tuple[int, str], list]:
+        results: Dict[Tuple[int, str], list] = {}
+        pending = deque(requests)
+        retry: deque = deque()
+
+        async def worker() -> None:
+            while pending or retry:
+                if retry:
+                    group = retry.popleft()
+                else:
+                    size = min(self._kong_batch_size, len(pending))
+                    group = [pending.popleft() for _ in range(size)]
+                try:
+                    ok = await self._post_kong_batch(group, limit, results)
+                except CircuitOpenError:
+                    # Kong is down: drop the rest so callers fall back to cached series right away.
+                    skipped = len(group) + len(pending) + sum(len(g) for g in retry)
+                    pending.clear()
+                    retry.clear()
+                    if skipped:
+                        logger.warning("Kong circuit open; skipped %s series", skipped)
+                    return
+                if ok:
+                    self._kong_batch_size = min(KONG_BATCH_MAX, self._kong_batch_size + KONG_BATCH_STEP)
+                    continue
+                if len(group) == 1:
+                    chain_id, address, since = group[0]
+                    data = await self.fetch_historical_pricepershare_kong(address, chain_id, limit, since=since)
+                    # An empty series is an answer too; only a failed request leaves the vault missing.
+                    if data is not None:
+                        results[(chain_id, address.lower())] = data
+                    continue
+                self._kong_batch_size = max(KONG_BATCH_MIN, len(group) // 2)
+                middle = len(group) // 2
+                retry.append(group[:middle])
+                retry.append(group[middle:])
+
+        await asyncio.gather(*[worker() for _ in range(KONG_BATCH_CONCURRENCY)])
+        return results
+
+    async def _post_kong_batch(
+        self,
+        group: List[Tuple[int, str, Optional[int]]],
+        limit: int,
+        results: Dict[Tuple[int, str], list],
+    ) -> bool:
+        declarations = ["$label: String!", "$component: String", "$limit: Int"]
+        selections = []
+        variables: Dict[str, object] = {"label": "pps", "component": "humanized", "limit": limit}
+        for idx, (chain_id, address, since) in enumerate(group):
+            declarations.extend([f"$c{idx}: Int", f"$a{idx}: String", f"$t{idx}: BigInt"])
+            selections.append(
+                f"v{idx}: timeseries(label: $label, chainId: $c{idx}, address: $a{idx}, component: $component, "
+                f"limit: $limit, timestamp: $t{idx}) {{ time value }}"
+            )
+            variables[f"c{idx}"] = chain_id
+            variables[f"a{idx}"] = address
+            variables[f"t{idx}"] = str(since) if since is not None else None
+        query = f"query Batch({', '.join(declarations)}) {{ {' '.join(selections)} }}"
+
+        breaker = circuit_breaker("kong")
+        if not breaker.allow():
+            raise CircuitOpenError("Kong circuit open")
+        try:
+            session = self._http.session
+            async with session.post(KONG_URL, json={"query": query, "variables": variables}, timeout=30) as response:
+                if response.status != 200:
+                    logger.warning("Kong batch of %s failed: status %s", len(group), response.status)
+                    breaker.record_failure()
+                    return False
+                data = await response.json()
+        except Exception as exc:
+            logger.warning("Kong batch of %s failed: %s", len(group), exc)
+            breaker.record_failure()
+            return False
+        breaker.record_success()
+
+        payload = data.get("data") if isinstance(data, dict) else None
+        if not isinstance(payload, dict):
+            logger.warning("Kong batch of %s returned no data: %s", len(group), (data or {}).get("errors"))
+            return False
+
+        failed = 0
+        for idx, (chain_id, address, _since) in enumerate(group):
+            timeseries = payload.get(f"v{idx}")
+            if isinstance(timeseries, list):
+                results[(chain_id, address.lower())] = timeseries
+            else:
+                failed += 1
+        if failed:
+            logger.warning("Kong batch: %s of %s series failed", failed, len(group))
+        return True
+
+    def cache_timestamps(self, generation: Optional[CacheGeneration] = None) -> Dict[str, float]:
+        current = generation or self._current
         return {
-            "ydaemon": self._cache["ydaemon"]["timestamp"],
-            "kong": self._cache["kong"]["timestamp"],
-            "1up": self._cache["1up"]["timestamp"],
+            "ydaemon": current.ydaemon.timestamp,
+            "kong": current.kong.timestamp,
+            "1up": current.one_up.timestamp,
         }
 
     def cache_expiry_hours(self) -> Decimal:
@@ -0,0 +1,56 @@
+import bisect
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class YieldStats:
+    current_pps: Decimal
+    pps_7d: Decimal
+    pps_30d: Decimal
+    yield_7d: Decimal
+    yield_30d: Decimal
+
+
+def calculate_yield_with_decimal(current: Decimal, historical: Decimal) -> Decimal:
+    if historical == Decimal("0"):
+        return Decimal("0")
+    try:
+        return ((Decimal(current) / Decimal(historical)) - Decimal("1")) * Decimal("100")
+    except (InvalidOperation, TypeError) as exc:
+        logger.error("Yield calculation error: %s", exc)
+        return Decimal("0")
+
+
+def compute_yield_stats(sorted_timeseries: list, now: Optional[datetime] = None) -> Optional[YieldStats]:
+    if not sorted_timeseries:
+        return None
+    now = now or datetime.utcnow()
+    try:
+        times = [int(entry["time"]) for entry in sorted_timeseries]
+        ts_7d = int((now - timedelta(days=7)).timestamp())
+        ts_30d = int((now - timedelta(days=30)).timestamp())
+
+        def closest_at_or_before(target_ts: int) -> dict:
+            idx = bisect.bisect_right(times, target_ts) - 1
+            return sorted_timeseries[max(idx, 0)]
+
+        current_pps = Decimal(sorted_timeseries[-1]["value"])
+        pps_7d = Decimal(closest_at_or_before(ts_7d)["value"])
+        pps_30d = Decimal(closest_at_or_before(ts_30d)["value"])
+    except (KeyError, ValueError, TypeError, InvalidOperation) as exc:
+        logger.error("Timeseries processing error: %s", exc)
+        return None
+
+    return YieldStats(
+        current_pps=current_pps,
+        pps_7d=pps_7d,
+        pps_30d=pps_30d,
+        yield_7d=calculate_yield_with_decimal(current_pps, pps_7d),
+        yield_30d=calculate_yield_with_decimal(current_pps, pps_30d),
+    )
@@ -5,10 +5,14 @@ from datetime import datetime, time, timedelta, timezone
 
 from app.config import load_config
 from app.http import SharedHttpClient
+from app.chains import SUPPORTED_CHAINS
 from app.storage import SQLiteStore
 from app.web3_utils import Web3Manager
 from app.yearn_api import YearnApi
 from app.report import ReportService
+from app.report_queue import ReportQueue
+from app.scheduling import DailyScheduler
+from app.usage import UsageRecorder
 from app.bots.telegram_bot import TelegramBot
 from app.bots.discord_bot import DiscordBot
 
@@ -25,7 +29,7 @@ logger = logging.getLogger(__name__)
 async def _cache_loop(yearn_api: YearnApi, interval: int, stop_event: asyncio.Event) -> None:
     while not stop_event.is_set():
         try:
-            await yearn_api.update_all_caches()
+            await yearn_api.refresh()
         except Exception as exc:
             logger.error("Cache update failed: %s", exc)
         try:
@@ -63,23 +67,32 @@ async def main() -> None:
     http_client = SharedHttpClient()
     await http_client.start()
 
-    store = SQLiteStore(config.db_path)
+    store = SQLiteStore(config.db_path, config.db_read_connections, config.store_cache_max_entries)
     await store.init()
 
-    web3_manager = Web3Manager(config.alchemy_api_key)
+    web3_manager = Web3Manager(config.alchemy_api_key, http_client, config.rpc_urls, config.rpc_timeout_seconds)
+    await web3_manager.start(SUPPORTED_CHAINS)
     web3_manager.init_ens()
-    yearn_api = YearnApi(http_client, web3_manager, config.cache_expiry_seconds)
-    await yearn_api.update_all_caches()
+    yearn_api = YearnApi(http_client, web3_manager, config.cache_expiry_seconds, config.cache_snapshot_path)
+    if await yearn_api.load_snapshot():
+        logger.info("Serving from cache snapshot; refreshing in background")
+    else:
+        await yearn_api.update_all_caches()
 
     report_service = ReportService(config, yearn_api, web3_manager, http_client)
+    store.on_addresses_changed(report_service.on_addresses_changed)
+    usage = UsageRecorder(store, config.usage_flush_seconds)
+    report_queue = ReportQueue(config.report_workers, config.report_queue_max_depth)
 
     telegram_bot = None
     discord_bot = None
 
     if enable_telegram:
-        telegram_bot = TelegramBot(config, store, report_service, web3_manager)
+        telegram_bot = TelegramBot(config, store, report_service, web3_manager, usage, report_queue)
     if enable_discord:
-        discord_bot = DiscordBot(config, store, report_service, web3_manager, http_client, yearn_api)
+        discord_bot = DiscordBot(
+            config, store, report_service, web3_manager, http_client, yearn_api, usage, report_queue
+        )
 
     stop_event = asyncio.Event()
 
@@ -91,30 +104,48 @@ async def main() -> None:
         loop.add_signal_handler(sig, _handle_signal)
 
     background_tasks = [
-        asyncio.create_task(_cache_loop(yearn_api, config.cache_expiry_seconds, stop_event))
+        asyncio.create_task(_cache_loop(yearn_api, config.cache_expiry_seconds, stop_event)),
+        asyncio.create_task(usage.run(stop_event)),
+        asyncio.create_task(report_queue.run(stop_event)),
     ]
 
     if telegram_bot:
-        background_tasks.append(
-            asyncio.create_task(_daily_loop(config.daily_report_time_utc, stop_event, telegram_bot.send_daily_reports))
+        daily_scheduler = DailyScheduler(
+            "telegram",
+            config.daily_report_time_utc,
+            config.daily_report_window_minutes,
+            lambda: store.get_daily_users("telegram"),
+            lambda run_id, user_ids: telegram_bot.send_daily_reports(run_id, user_ids),
+            workers=config.daily_report_workers,
+            prewarm=telegram_bot.prewarm_daily_reports if config.daily_prewarm_minutes else None,
+            prewarm_minutes=config.daily_prewarm_minutes,
+            users_version=lambda: store.daily_settings_version,
         )
+        background_tasks.append(asyncio.create_task(daily_scheduler.run(stop_event)))
 
     async def usage_report_callback() -> None:
         date_str = datetime.utcnow().date().isoformat()
-        usage = await store.get_usage(date_str)
-        if usage.get("on_demand_reports") or usage.get("daily_reports"):
+        await usage.flush()
+        counters = await store.get_usage(date_str)
+        if counters.get("on_demand_reports") or counters.get("daily_reports"):
             if telegram_bot and config.telegram_admin_chat_id:
                 await telegram_bot.application.bot.send_message(
                     chat_id=config.telegram_admin_chat_id,
                     text=(
                         "Daily usage report:\n"
-                        f"On-demand reports: {usage.get('on_demand_reports')}\n"
-                        f"Daily reports: {usage.get('daily_reports')}"
+                        f"On-demand reports: {counters.get('on_demand_reports')}\n"
+                        f"Daily reports: {counters.get('daily_reports')}"
                     ),
                 )
             if discord_bot:
-                await discord_bot.send_usage_report(usage)
+                await discord_bot.send_usage_report(counters)
         await store.reset_usage(date_str)
+        logger.info(
+            "Cache stats: reports %s, balances %s, store %s",
+            report_service.report_cache_stats(),
+            report_service.balance_cache_stats(),
+            store.cache_stats(),
+        )
 
     background_tasks.append(
         asyncio.create_task(_daily_loop(time(hour=0, minute=1, tzinfo=timezone.utc), stop_event, usage_report_callback))
@@ -144,6 +175,8 @@ async def main() -> None:
     if telegram_bot:
         await telegram_bot.stop()
 
+    await usage.flush()
+    await web3_manager.stop()
     await http_client.close()
     await store.close()
 
@@ -0,0 +1,23 @@
+import types
+
+import pytest
+
+
+class FakeClock:
+    def __init__(self, start: float = 1000.0) -> None:
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+def install_clock(monkeypatch: pytest.MonkeyPatch, module: types.ModuleType, clock: FakeClock) -> None:
+    monkeypatch.setattr(module, "time", types.SimpleNamespace(monotonic=clock))
@@ -0,0 +1,94 @@
+import pytest
+
+from app import circuit
+from app.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+from .conftest import install_clock
+
+
+@pytest.fixture(autouse=True)
+def _clock(monkeypatch, clock):
+    install_clock(monkeypatch, circuit, clock)
+
+
+def _tripped(cooldown: float = 30) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", min_calls=2, failure_rate_threshold=0.5, cooldown_seconds=cooldown)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    return breaker
+
+
+def test_stays_closed_below_min_calls():
+    breaker = CircuitBreaker("test", min_calls=3)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_opens_at_failure_rate_threshold():
+    breaker = CircuitBreaker("test", min_calls=4, failure_rate_threshold=0.5)
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.blocked
+    assert not breaker.allow()
+
+
+def test_outcomes_outside_window_are_forgotten(clock):
+    breaker = CircuitBreaker("test", window_seconds=60, min_calls=2)
+    breaker.record_failure()
+    clock.advance(61)
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate() == 1.0
+
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = _tripped(cooldown=30)
+    clock.advance(30)
+    assert not breaker.blocked
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_successful_probe_closes(clock):
+    breaker = _tripped()
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate() == 0.0
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_with_longer_cooldown(clock):
+    breaker = _tripped(cooldown=30)
+    clock.advance(30)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.advance(30)
+    assert breaker.blocked
+    clock.advance(30)
+    assert not breaker.blocked
+
+
+def test_stalled_probe_is_replaced_after_cooldown(clock):
+    breaker = _tripped(cooldown=30)
+    clock.advance(30)
+    assert breaker.allow()
+    clock.advance(30)
+    assert breaker.allow()
+
+
+def test_registry_returns_shared_breakers():
+    breaker = circuit.circuit_breaker("test-registry")
+    assert circuit.circuit_breaker("test-registry") is breaker
+    assert "test-registry" in circuit.breaker_states(include_closed=True)
+    assert "test-registry" not in circuit.breaker_states()
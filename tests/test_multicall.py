@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+from eth_abi import decode, encode
+
+from app.multicall import (
+    AGGREGATE3_SELECTOR,
+    MULTICALL3_ADDRESS,
+    MulticallError,
+    aggregate3,
+    balance_of_calldata,
+    chunk_calls,
+    decode_address,
+    decode_aggregate3,
+    decode_uint,
+    encode_aggregate3,
+)
+
+TOKEN = "0x" + "11" * 20
+OWNER = "0x" + "22" * 20
+
+
+def _decode_request(data: bytes):
+    assert data[:4] == AGGREGATE3_SELECTOR
+    (calls,) = decode(["(address,bool,bytes)[]"], data[4:])
+    return calls
+
+
+def _encode_response(results) -> bytes:
+    return encode(["(bool,bytes)[]"], [results])
+
+
+def test_encode_aggregate3_allows_failure_per_call():
+    calldata = balance_of_calldata(OWNER)
+    calls = _decode_request(encode_aggregate3([(TOKEN, calldata)]))
+    assert [(target.lower(), allow, bytes(data)) for target, allow, data in calls] == [(TOKEN, True, calldata)]
+
+
+def test_decode_aggregate3_round_trip():
+    response = _encode_response([(True, b"\x01" * 32), (False, b"")])
+    assert decode_aggregate3(response) == [(True, b"\x01" * 32), (False, b"")]
+
+
+def test_decoders_reject_short_data():
+    assert decode_uint(None) is None
+    assert decode_uint(b"\x00" * 31) is None
+    assert decode_uint((5).to_bytes(32, "big")) == 5
+    assert decode_address(b"") is None
+    assert decode_address(b"\x00" * 12 + bytes.fromhex("22" * 20)).lower() == OWNER
+
+
+def test_chunk_calls_respects_calldata_budget():
+    calls = [(TOKEN, balance_of_calldata(OWNER))] * 5
+    # Each balanceOf call takes 160 bytes of tuple overhead plus 64 bytes of padded calldata.
+    assert chunk_calls(calls, max_calldata_bytes=2 * 224) == [[0, 1], [2, 3], [4]]
+
+
+def test_chunk_calls_keeps_oversized_call_on_its_own():
+    calls = [(TOKEN, b"\x00" * 4), (TOKEN, b"\x00" * 1000), (TOKEN, b"\x00" * 4)]
+    assert chunk_calls(calls, max_calldata_bytes=300) == [[0], [1], [2]]
+
+
+def _echo_eth_call(requests):
+    async def eth_call(to: str, data: bytes) -> bytes:
+        assert to == MULTICALL3_ADDRESS
+        calls = _decode_request(data)
+        requests.append(len(calls))
+        # Calls with empty calldata fail; the rest echo their calldata back.
+        return _encode_response([(bool(calldata), bytes(calldata)) for _target, _allow, calldata in calls])
+
+    return eth_call
+
+
+def test_aggregate3_keeps_call_order_across_chunks():
+    requests = []
+    calls = [(TOKEN, i.to_bytes(4, "big") if i % 3 else b"") for i in range(7)]
+    results = asyncio.run(aggregate3(_echo_eth_call(requests), calls, 1, max_calldata_bytes=2 * 192))
+    assert requests == [2, 2, 2, 1]
+    assert results == [None if i % 3 == 0 else i.to_bytes(4, "big") for i in range(7)]
+
+
+def test_aggregate3_without_calls_skips_rpc():
+    requests = []
+    assert asyncio.run(aggregate3(_echo_eth_call(requests), [], 1)) == []
+    assert requests == []
+
+
+def test_aggregate3_raises_when_a_chunk_fails():
+    async def eth_call(to: str, data: bytes) -> bytes:
+        if len(_decode_request(data)) == 1:
+            raise ConnectionError("rpc down")
+        return _encode_response([(True, b"")] * 2)
+
+    calls = [(TOKEN, b"\x00" * 4)] * 3
+    with pytest.raises(ConnectionError):
+        asyncio.run(aggregate3(eth_call, calls, 1, max_calldata_bytes=2 * 192))
+
+
+def test_aggregate3_rejects_mismatched_result_count():
+    async def eth_call(to: str, data: bytes) -> bytes:
+        return _encode_response([(True, b"")])
+
+    with pytest.raises(MulticallError):
+        asyncio.run(aggregate3(eth_call, [(TOKEN, b"\x00" * 4)] * 2, 1))
+
+
+def test_aggregate3_rejects_undecodable_response():
+    async def eth_call(to: str, data: bytes) -> bytes:
+        return b"\x00"
+
+    with pytest.raises(MulticallError):
+        asyncio.run(aggregate3(eth_call, [(TOKEN, b"\x00" * 4)], 1))
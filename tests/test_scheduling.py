@@ -0,0 +1,84 @@
+import asyncio
+from datetime import date, datetime, time, timedelta, timezone
+
+from app.scheduling import DailyScheduler, daily_run_id, daily_slot, parse_daily_time, stable_offset_seconds
+
+DAY = date(2026, 3, 14)
+
+
+def _scheduler(base_time=time(9, 0), window_minutes=60, load_users=None, **kwargs) -> DailyScheduler:
+    async def no_users():
+        return []
+
+    async def dispatch(_run_id, _user_ids):
+        return None
+
+    return DailyScheduler("telegram", base_time, window_minutes, load_users or no_users, dispatch, **kwargs)
+
+
+def test_parse_daily_time():
+    assert parse_daily_time(" 07:30 ") == time(7, 30)
+    assert parse_daily_time("25:00") is None
+    assert parse_daily_time("") is None
+    assert parse_daily_time(None) is None
+
+
+def test_stable_offset_is_deterministic_and_inside_window():
+    offsets = {stable_offset_seconds("telegram", str(user_id), 60) for user_id in range(200)}
+    assert all(0 <= offset < 3600 for offset in offsets)
+    assert len(offsets) > 1
+    assert stable_offset_seconds("telegram", "42", 60) == stable_offset_seconds("telegram", "42", 60)
+    assert stable_offset_seconds("telegram", "42", 0) == 0
+
+
+def test_daily_slot_uses_preferred_time_over_window():
+    slot = daily_slot("telegram", "42", DAY, time(9, 0), 60, preferred=time(18, 15))
+    assert slot == datetime(2026, 3, 14, 18, 15, tzinfo=timezone.utc)
+
+
+def test_daily_slot_spills_past_midnight():
+    user_id = next(str(uid) for uid in range(1000) if stable_offset_seconds("telegram", str(uid), 60) > 15 * 60)
+    slot = daily_slot("telegram", user_id, DAY, time(23, 45), 60)
+    assert slot.date() == DAY + timedelta(days=1)
+
+
+def test_due_users_picks_up_spilled_slot_under_previous_run():
+    user_id = next(str(uid) for uid in range(1000) if stable_offset_seconds("telegram", str(uid), 60) > 15 * 60)
+    scheduler = _scheduler(base_time=time(23, 45))
+    slot = scheduler.slot_for(user_id, DAY)
+    due = scheduler.due_users([{"user_id": user_id}], slot - timedelta(seconds=1), slot)
+    assert due == [(daily_run_id(DAY), user_id)]
+
+
+def test_due_users_skips_seen_and_respects_lead():
+    scheduler = _scheduler()
+    users = [{"user_id": "1", "daily_report_time": "10:00"}]
+    slot = datetime(2026, 3, 14, 10, 0, tzinfo=timezone.utc)
+    assert scheduler.due_users(users, slot - timedelta(minutes=1), slot) == [(daily_run_id(DAY), "1")]
+    assert scheduler.due_users(users, slot, slot + timedelta(minutes=1)) == []
+    lead = timedelta(minutes=5)
+    early = slot - lead
+    assert scheduler.due_users(users, early - timedelta(minutes=1), early, lead, set()) == [(daily_run_id(DAY), "1")]
+    seen = {(daily_run_id(DAY), "1")}
+    assert scheduler.due_users(users, slot - timedelta(minutes=1), slot, seen=seen) == []
+
+
+def test_users_are_reloaded_only_on_version_change_or_interval():
+    loads = []
+    version = [0]
+
+    async def load_users():
+        loads.append(1)
+        return [{"user_id": str(len(loads))}]
+
+    async def scenario():
+        scheduler = _scheduler(load_users=load_users, users_version=lambda: version[0], reload_seconds=3600)
+        assert await scheduler._current_users() == [{"user_id": "1"}]
+        assert await scheduler._current_users() == [{"user_id": "1"}]
+        version[0] += 1
+        assert await scheduler._current_users() == [{"user_id": "2"}]
+        scheduler._users_loaded_at -= 3600
+        assert await scheduler._current_users() == [{"user_id": "3"}]
+
+    asyncio.run(scenario())
+    assert len(loads) == 3
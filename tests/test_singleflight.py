@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def test_do_shares_one_call_between_concurrent_callers():
+    async def scenario():
+        flights = SingleFlight()
+        calls = []
+        release = asyncio.Event()
+
+        async def factory():
+            calls.append(1)
+            await release.wait()
+            return "value"
+
+        first = asyncio.ensure_future(flights.do("key", factory))
+        second = asyncio.ensure_future(flights.do("key", factory))
+        await asyncio.sleep(0)
+        assert flights.in_flight("key")
+        release.set()
+        assert await asyncio.gather(first, second) == ["value", "value"]
+        assert len(calls) == 1
+        assert not flights.in_flight("key")
+
+        assert await flights.do("key", factory) == "value"
+        assert len(calls) == 2
+
+    asyncio.run(scenario())
+
+
+def test_do_propagates_errors_and_clears_the_flight():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def factory():
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            await flights.do("key", factory)
+        assert not flights.in_flight("key")
+
+    asyncio.run(scenario())
+
+
+def test_do_many_only_fetches_keys_not_already_in_flight():
+    async def scenario():
+        flights = SingleFlight()
+        batches = []
+        release = asyncio.Event()
+
+        async def factory(keys):
+            batches.append(sorted(keys))
+            await release.wait()
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        first = asyncio.ensure_future(flights.do_many(["a", "b", "a"], factory))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.do_many(["b", "c", "missing"], factory))
+        await asyncio.sleep(0)
+        release.set()
+        assert await first == {"a": "A", "b": "B"}
+        assert await second == {"b": "B", "c": "C"}
+        assert batches == [["a", "b"], ["c", "missing"]]
+
+    asyncio.run(scenario())
+
+
+def test_do_many_error_reaches_every_waiter():
+    async def scenario():
+        flights = SingleFlight()
+        release = asyncio.Event()
+
+        async def factory(keys):
+            await release.wait()
+            raise RuntimeError("upstream down")
+
+        first = asyncio.ensure_future(flights.do_many(["a", "b"], factory))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.do_many(["b"], factory))
+        await asyncio.sleep(0)
+        release.set()
+        for waiter in (first, second):
+            with pytest.raises(RuntimeError):
+                await waiter
+        assert not flights.in_flight("a")
+        assert not flights.in_flight("b")
+
+    asyncio.run(scenario())
@@ -0,0 +1,30 @@
+from app.yearn_api import merge_timeseries
+
+
+def _points(*times, value="1"):
+    return [{"time": t, "value": value} for t in times]
+
+
+def test_merge_sorts_and_prefers_new_points():
+    existing = _points(300, 100)
+    new = [{"time": "200", "value": "2"}, {"time": 300, "value": "3"}]
+    assert merge_timeseries(existing, new, cutoff=0) == [
+        {"time": 100, "value": "1"},
+        {"time": 200, "value": "2"},
+        {"time": 300, "value": "3"},
+    ]
+
+
+def test_merge_drops_malformed_points():
+    points = [{"time": "x", "value": "1"}, {"value": "1"}, {"time": 5, "value": None}, None, {"time": 6, "value": "1"}]
+    assert merge_timeseries(points, [], cutoff=0) == _points(6)
+
+
+def test_trim_keeps_one_anchor_at_or_before_cutoff():
+    assert merge_timeseries(_points(10, 20, 30, 40), [], cutoff=25) == _points(20, 30, 40)
+    assert merge_timeseries(_points(10, 20, 30, 40), [], cutoff=30) == _points(30, 40)
+
+
+def test_trim_keeps_everything_after_cutoff():
+    assert merge_timeseries(_points(30, 40), [], cutoff=25) == _points(30, 40)
+    assert merge_timeseries([], [], cutoff=25) == []
@@ -0,0 +1,82 @@
+import pytest
+
+from app import ttl_cache
+from app.ttl_cache import TTLCache
+
+from .conftest import install_clock
+
+
+@pytest.fixture(autouse=True)
+def _clock(monkeypatch, clock):
+    install_clock(monkeypatch, ttl_cache, clock)
+
+
+def test_get_counts_hits_and_misses():
+    cache = TTLCache(4, ttl=10)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1, "evictions": 0}
+
+
+def test_expired_entries_miss_but_stay_readable_as_stale(clock):
+    cache = TTLCache(4, ttl=10)
+    cache.set("a", 1)
+    clock.advance(10)
+    assert cache.get("a") is None
+    assert "a" not in cache
+    assert cache.get_stale("a") == 1
+    assert cache.misses == 1
+
+
+def test_get_stale_respects_max_stale(clock):
+    cache = TTLCache(4, ttl=10)
+    cache.set("a", 1)
+    clock.advance(15)
+    assert cache.get_stale("a", max_stale=10) == 1
+    clock.advance(10)
+    assert cache.get_stale("a", max_stale=10) is None
+    assert cache.get_stale("a") == 1
+
+
+def test_per_entry_ttl_and_no_ttl(clock):
+    cache = TTLCache(4)
+    cache.set("forever", 1)
+    cache.set("short", 2, ttl=1)
+    clock.advance(5)
+    assert cache.get("forever") == 1
+    assert cache.get("short") is None
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TTLCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert cache.peek("c") == 3
+    assert cache.evictions == 1
+
+
+def test_peek_and_contains_do_not_touch_stats():
+    cache = TTLCache(2)
+    cache.set("a", 1)
+    assert cache.peek("a") == 1
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.hits == 0 and cache.misses == 0
+
+
+def test_invalidate_pop_and_clear():
+    cache = TTLCache(8)
+    for key in ("a1", "a2", "b1"):
+        cache.set(key, key)
+    assert cache.invalidate(lambda key: key.startswith("a")) == 2
+    assert len(cache) == 1
+    assert cache.pop("b1") == "b1"
+    assert cache.pop("b1") is None
+    cache.set("c", 1)
+    cache.clear()
+    assert len(cache) == 0